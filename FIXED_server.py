@@ -56,7 +56,7 @@ except ImportError:
     logging.warning("⚠️ Feedback system not available")
 
 try:
-    from threat_intelligence import check_domain_reputation, check_url_reputation
+    from threat_intelligence import check_domain_reputation, check_url_reputation, close_threat_intelligence
     THREAT_INTEL_AVAILABLE = True
     logging.info("✅ Threat intelligence loaded")
 except ImportError:
@@ -221,6 +221,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     try:
+        if THREAT_INTEL_AVAILABLE:
+            await close_threat_intelligence()
         await close_mongo_connection()
         logger.info("✅ Application shutdown completed")
     except Exception as e:
@@ -394,6 +394,55 @@ class AdminFunctionalityTester:
             self.log_result("System Monitoring Real Metrics", False, f"Request failed: {str(e)}")
             return False
     
+    def test_deactivated_user_rejected(self):
+        """Test that a deactivated user's token is rejected on the next request"""
+        try:
+            admin_headers = {"Authorization": f"Bearer {self.admin_token}"}
+            user_headers = {"Authorization": f"Bearer {self.regular_user_token}"}
+            
+            # Warm the server's user cache with the active user
+            requests.get(f"{self.backend_url}/user/profile", headers=user_headers, timeout=10)
+            
+            status_response = requests.put(
+                f"{self.backend_url}/admin/users/{self.test_user_id}/status",
+                json={"is_active": False},
+                headers=admin_headers,
+                timeout=10
+            )
+            
+            if status_response.status_code == 403:
+                print("⏭️  SKIP Deactivated User Rejected - admin role required to deactivate users")
+                return None
+            if status_response.status_code != 200:
+                self.log_result("Deactivated User Rejected", False,
+                              f"Deactivation failed: {status_response.status_code}")
+                return False
+            
+            try:
+                profile_response = requests.get(
+                    f"{self.backend_url}/user/profile", headers=user_headers, timeout=10
+                )
+            finally:
+                # Reactivate so later tests can keep using the regular user
+                requests.put(
+                    f"{self.backend_url}/admin/users/{self.test_user_id}/status",
+                    json={"is_active": True},
+                    headers=admin_headers,
+                    timeout=10
+                )
+            
+            if profile_response.status_code in (400, 401):
+                self.log_result("Deactivated User Rejected", True,
+                              f"Deactivated user rejected immediately ({profile_response.status_code})")
+                return True
+            self.log_result("Deactivated User Rejected", False,
+                          f"Deactivated user still accepted: {profile_response.status_code}")
+            return False
+            
+        except requests.exceptions.RequestException as e:
+            self.log_result("Deactivated User Rejected", False, f"Request failed: {str(e)}")
+            return False
+    
     def test_admin_action_logging_functionality(self):
         """Test admin action logging functionality"""
         try:
@@ -527,6 +576,7 @@ class AdminFunctionalityTester:
             self.test_user_management_with_real_users,
             self.test_threat_management_with_real_data,
             self.test_system_monitoring_real_metrics,
+            self.test_deactivated_user_rejected,
             self.test_admin_action_logging_functionality,
             self.test_admin_panel_business_value
         ]
@@ -536,7 +586,11 @@ class AdminFunctionalityTester:
         
         for test in admin_tests:
             try:
-                if test():
+                result = test()
+                if result is None:
+                    # Skipped tests count neither way
+                    total -= 1
+                elif result:
                     passed += 1
             except Exception as e:
                 self.log_result(test.__name__, False, f"Test exception: {str(e)}")
@@ -545,7 +599,7 @@ class AdminFunctionalityTester:
         print("📊 ADMIN FUNCTIONALITY TEST RESULTS SUMMARY")
         print("=" * 80)
         
-        success_rate = (passed / total) * 100
+        success_rate = (passed / total) * 100 if total else 0.0
         print(f"✅ Tests Passed: {passed}/{total} ({success_rate:.1f}%)")
         
         if passed == total:
@@ -575,6 +629,7 @@ class AdminFunctionalityTester:
         print("   ✅ User Management with Real Users")
         print("   ✅ Threat Management with Real Threat Data")
         print("   ✅ System Monitoring with Real Metrics")
+        print("   ✅ Deactivated User Rejection")
         print("   ✅ Admin Action Logging")
         print("   ✅ Business Value & Insights")
         
@@ -450,6 +450,8 @@ async def init_collections():
         await db.users.create_index("id", unique=True, background=True)
         await db.email_scans.create_index("user_id", background=True)
         await db.email_scans.create_index("created_at", background=True)
+        # Per-user time-range queries (dashboard statistics) seek and sort on this directly
+        await db.email_scans.create_index([("user_id", 1), ("created_at", -1)], background=True)
         await db.user_settings.create_index("user_id", unique=True, background=True)
         await db.threat_logs.create_index("created_at", background=True)
         await db.feedback.create_index("user_id", background=True)
@@ -5,20 +5,42 @@ Provides real-time threat intelligence for enhanced security analysis
 
 import asyncio
 import aiohttp
-import hashlib
 import time
-from typing import Dict, List, Optional, Any, Set
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, FrozenSet, Set, Tuple, Hashable
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
 import re
 import ipaddress
+import urllib.parse
 from dataclasses import dataclass
 from database import get_database
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Optional Aho-Corasick automaton for matching all suspicious trigger substrings in one pass
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Optional fast non-cryptographic hash for URL cache keys
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+def _url_cache_key(url: str) -> Tuple[str, int]:
+    """Cache key for a URL lookup: an integer digest instead of a hex string"""
+    if XXHASH_AVAILABLE:
+        return ("url", xxhash.xxh64_intdigest(url.encode()))
+    # Built-in str hash is seeded per process, which is fine for an in-memory cache
+    return ("url", hash(url))
+
 class ThreatCategory(Enum):
     MALWARE = "malware"
     PHISHING = "phishing"
@@ -36,8 +58,206 @@ class ThreatSeverity(Enum):
     LOW = "low"
     NONE = "none"
 
-@dataclass
+# Curated known-malicious domains, built once at import
+_MALICIOUS_DOMAINS = frozenset({
+    # Known phishing domains
+    "phishing-bank.com", "fake-paypal.net", "amazon-verify.org",
+    "microsoft-security.info", "google-alert.co", "apple-support.net",
+    "secure-banking.org", "account-update.info", "verify-account.net",
+    
+    # Malware distribution
+    "malware-host.com", "trojan-download.net", "virus-site.org",
+    "infected-files.com", "malicious-payload.net",
+    
+    # Spam domains
+    "cheap-meds.org", "quick-money.net", "work-from-home.biz",
+    "lottery-winner.com", "inheritance-claim.net",
+    
+    # Cryptocurrency scams
+    "crypto-doubler.com", "bitcoin-giveaway.net", "invest-crypto.org",
+    "mining-profit.com", "coin-multiplier.net",
+    
+    # Tech support scams
+    "pc-repair-now.com", "virus-removal.net", "system-alert.org",
+    "computer-help.info", "tech-support-urgent.com"
+})
+
+# Curated known-safe domains, built once at import
+_SAFE_DOMAINS = frozenset({
+    # Major tech companies
+    "google.com", "microsoft.com", "apple.com", "amazon.com",
+    "facebook.com", "meta.com", "twitter.com", "linkedin.com",
+    
+    # Financial institutions
+    "paypal.com", "stripe.com", "square.com", "bankofamerica.com",
+    "chase.com", "wellsfargo.com", "citibank.com",
+    
+    # Email providers
+    "gmail.com", "outlook.com", "yahoo.com", "protonmail.com",
+    "icloud.com", "zoho.com",
+    
+    # Cloud services
+    "aws.amazon.com", "azure.microsoft.com", "cloud.google.com",
+    "dropbox.com", "box.com", "onedrive.com",
+    
+    # Development and tech
+    "github.com", "stackoverflow.com", "reddit.com", "wikipedia.org",
+    "mozilla.org", "cloudflare.com", "netlify.com"
+})
+
+# Top-level domains commonly used for throwaway phishing sites
+_SUSPICIOUS_TLDS = frozenset({"tk", "ml", "cf", "ga", "pw"})
+# Four or more consecutive digits; unanchored, so the engine doesn't walk a leading .*
+_DIGIT_RUN_RE = re.compile(r"\d{4}")
+
+def _has_suspicious_tld(domain: str) -> bool:
+    """True if the domain ends in one of _SUSPICIOUS_TLDS"""
+    _, dot, tld = domain.rpartition(".")
+    return bool(dot) and tld in _SUSPICIOUS_TLDS
+
+# Suspicious domain patterns. "pattern" is the rule as recorded in results; "check" is the
+# equivalent plain string test, so lookups don't run .*-prefixed regexes
+_SUSPICIOUS_DOMAIN_PATTERNS = [
+    {
+        "pattern": r".*-security\..*",
+        "check": lambda d: "-security." in d,
+        "description": "Domains with 'security' keyword",
+        "severity": ThreatSeverity.MEDIUM,
+        "confidence": 0.6
+    },
+    {
+        "pattern": r".*-verification\..*",
+        "check": lambda d: "-verification." in d,
+        "description": "Domains with 'verification' keyword",
+        "severity": ThreatSeverity.MEDIUM,
+        "confidence": 0.7
+    },
+    {
+        "pattern": r".*-update\..*",
+        "check": lambda d: "-update." in d,
+        "description": "Domains with 'update' keyword",
+        "severity": ThreatSeverity.LOW,
+        "confidence": 0.5
+    },
+    {
+        "pattern": r"secure-.*\..*",
+        "check": lambda d: d.startswith("secure-") and "." in d[7:],
+        "description": "Domains starting with 'secure'",
+        "severity": ThreatSeverity.MEDIUM,
+        "confidence": 0.6
+    },
+    {
+        "pattern": r".*\.(tk|ml|cf|ga|pw)$",
+        "check": _has_suspicious_tld,
+        "description": "Suspicious top-level domains",
+        "severity": ThreatSeverity.HIGH,
+        "confidence": 0.8
+    },
+    {
+        "pattern": r".*\d{4,}.*",
+        "check": lambda d: _DIGIT_RUN_RE.search(d) is not None,
+        "description": "Domains with many numbers",
+        "severity": ThreatSeverity.LOW,
+        "confidence": 0.3
+    },
+    {
+        "pattern": r".*-{3,}.*",
+        "check": lambda d: "---" in d,
+        "description": "Domains with multiple hyphens",
+        "severity": ThreatSeverity.MEDIUM,
+        "confidence": 0.5
+    }
+]
+
+# Literal substrings, at least one of which appears in any domain matching a pattern other
+# than the digit run; most domains contain none, so they skip the pattern loop entirely
+_SUSPICIOUS_TRIGGERS = frozenset(
+    {"-security.", "-verification.", "-update.", "secure-", "---"}
+    | {f".{tld}" for tld in _SUSPICIOUS_TLDS}
+)
+
+def _build_trigger_automaton(triggers: FrozenSet[str]):
+    """Build an Aho-Corasick automaton over triggers, or None if pyahocorasick is missing"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for trigger in triggers:
+        automaton.add_word(trigger, trigger)
+    automaton.make_automaton()
+    return automaton
+
+_TRIGGER_AUTOMATON = _build_trigger_automaton(_SUSPICIOUS_TRIGGERS)
+
+def _contains_trigger(domain: str) -> bool:
+    """True if any of _SUSPICIOUS_TRIGGERS occurs in domain"""
+    # One scan of the domain regardless of how many triggers there are
+    if _TRIGGER_AUTOMATON is not None:
+        return next(_TRIGGER_AUTOMATON.iter(domain), None) is not None
+    return any(t in domain for t in _SUSPICIOUS_TRIGGERS)
+
+def _may_match_suspicious_pattern(domain: str) -> bool:
+    """Cheap prefilter: False means no entry in _SUSPICIOUS_DOMAIN_PATTERNS can match"""
+    # Digit runs have no fixed literal, so they are checked directly
+    return _contains_trigger(domain) or _DIGIT_RUN_RE.search(domain) is not None
+
+# Suspicious URL patterns, compiled once at import; case-insensitive so URLs need no lowercasing
+_SUSPICIOUS_URL_PATTERNS = [
+    {
+        "pattern": re.compile(r".*bit\.ly.*", re.IGNORECASE),
+        "description": "Shortened URL service",
+        "severity": ThreatSeverity.MEDIUM,
+        "confidence": 0.6
+    },
+    {
+        "pattern": re.compile(r".*\?.*=.*http.*", re.IGNORECASE),
+        "description": "URL with suspicious redirect parameter",
+        "severity": ThreatSeverity.HIGH,
+        "confidence": 0.8
+    },
+    {
+        "pattern": re.compile(r".*\.(exe|bat|scr|com|pif)$", re.IGNORECASE),
+        "description": "URL pointing to executable file",
+        "severity": ThreatSeverity.CRITICAL,
+        "confidence": 0.9
+    }
+]
+
+def _url_netloc(url: str) -> str:
+    """Lowercased netloc of url, splitting plain http(s) URLs without urlparse"""
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme.lower() in ("http", "https"):
+        netloc = rest.partition("/")[0].partition("?")[0].partition("#")[0]
+        # urlparse strips tabs/newlines and validates brackets and non-ASCII hosts; defer to it then
+        if netloc and netloc.isascii() and netloc.isprintable() and "[" not in netloc and "]" not in netloc:
+            return netloc.lower()
+    return urllib.parse.urlparse(url).netloc.lower()
+
+def _fuse_patterns(patterns: List[Dict[str, Any]], flags: int = 0) -> "re.Pattern":
+    """Combine patterns into one alternation; group gN marks a match of patterns[N]"""
+    # Alternatives are tried in list order, so the first listed pattern that matches still wins
+    return re.compile(
+        "|".join(f"(?P<g{i}>{info['pattern'].pattern})" for i, info in enumerate(patterns)),
+        flags
+    )
+
+def _first_pattern_match(fused: "re.Pattern", patterns: List[Dict[str, Any]], text: str,
+                         search: bool = False) -> Optional[Dict[str, Any]]:
+    """Return the pattern info whose alternative matched text, or None"""
+    match = fused.search(text) if search else fused.match(text)
+    if match is None:
+        return None
+    return patterns[int(match.lastgroup[1:])]
+
+_FUSED_URL_RE = _fuse_patterns(_SUSPICIOUS_URL_PATTERNS, re.IGNORECASE)
+
+@dataclass(frozen=True)
 class ThreatIntelligenceEntry:
+    # Declared by hand since dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        "domain", "ip_address", "category", "severity", "confidence", "source",
+        "description", "first_seen", "last_seen", "indicators", "metadata"
+    )
+    
     domain: str
     ip_address: Optional[str]
     category: ThreatCategory
@@ -98,113 +318,31 @@ class LocalThreatIntelligence(ThreatIntelligenceProvider):
         self.suspicious_patterns = self._load_suspicious_patterns()
         self.threat_ip_ranges = self._load_threat_ip_ranges()
     
-    def _load_malicious_domains(self) -> Set[str]:
+    def _load_malicious_domains(self) -> FrozenSet[str]:
         """Load known malicious domains"""
-        return {
-            # Known phishing domains
-            "phishing-bank.com", "fake-paypal.net", "amazon-verify.org",
-            "microsoft-security.info", "google-alert.co", "apple-support.net",
-            "secure-banking.org", "account-update.info", "verify-account.net",
-            
-            # Malware distribution
-            "malware-host.com", "trojan-download.net", "virus-site.org",
-            "infected-files.com", "malicious-payload.net",
-            
-            # Spam domains
-            "cheap-meds.org", "quick-money.net", "work-from-home.biz",
-            "lottery-winner.com", "inheritance-claim.net",
-            
-            # Cryptocurrency scams
-            "crypto-doubler.com", "bitcoin-giveaway.net", "invest-crypto.org",
-            "mining-profit.com", "coin-multiplier.net",
-            
-            # Tech support scams
-            "pc-repair-now.com", "virus-removal.net", "system-alert.org",
-            "computer-help.info", "tech-support-urgent.com"
-        }
+        return _MALICIOUS_DOMAINS
     
-    def _load_safe_domains(self) -> Set[str]:
+    def _load_safe_domains(self) -> FrozenSet[str]:
         """Load known safe domains"""
-        return {
-            # Major tech companies
-            "google.com", "microsoft.com", "apple.com", "amazon.com",
-            "facebook.com", "meta.com", "twitter.com", "linkedin.com",
-            
-            # Financial institutions
-            "paypal.com", "stripe.com", "square.com", "bankofamerica.com",
-            "chase.com", "wellsfargo.com", "citibank.com",
-            
-            # Email providers
-            "gmail.com", "outlook.com", "yahoo.com", "protonmail.com",
-            "icloud.com", "zoho.com",
-            
-            # Cloud services
-            "aws.amazon.com", "azure.microsoft.com", "cloud.google.com",
-            "dropbox.com", "box.com", "onedrive.com",
-            
-            # Development and tech
-            "github.com", "stackoverflow.com", "reddit.com", "wikipedia.org",
-            "mozilla.org", "cloudflare.com", "netlify.com"
-        }
+        return _SAFE_DOMAINS
     
     def _load_suspicious_patterns(self) -> List[Dict[str, Any]]:
         """Load suspicious domain patterns"""
-        return [
-            {
-                "pattern": r".*-security\..*",
-                "description": "Domains with 'security' keyword",
-                "severity": ThreatSeverity.MEDIUM,
-                "confidence": 0.6
-            },
-            {
-                "pattern": r".*-verification\..*",
-                "description": "Domains with 'verification' keyword",
-                "severity": ThreatSeverity.MEDIUM,
-                "confidence": 0.7
-            },
-            {
-                "pattern": r".*-update\..*",
-                "description": "Domains with 'update' keyword",
-                "severity": ThreatSeverity.LOW,
-                "confidence": 0.5
-            },
-            {
-                "pattern": r"secure-.*\..*",
-                "description": "Domains starting with 'secure'",
-                "severity": ThreatSeverity.MEDIUM,
-                "confidence": 0.6
-            },
-            {
-                "pattern": r".*\.(tk|ml|cf|ga|pw)$",
-                "description": "Suspicious top-level domains",
-                "severity": ThreatSeverity.HIGH,
-                "confidence": 0.8
-            },
-            {
-                "pattern": r".*\d{4,}.*",
-                "description": "Domains with many numbers",
-                "severity": ThreatSeverity.LOW,
-                "confidence": 0.3
-            },
-            {
-                "pattern": r".*-{3,}.*",
-                "description": "Domains with multiple hyphens",
-                "severity": ThreatSeverity.MEDIUM,
-                "confidence": 0.5
-            }
-        ]
+        return _SUSPICIOUS_DOMAIN_PATTERNS
     
     def _load_threat_ip_ranges(self) -> List[Dict[str, Any]]:
-        """Load known threat IP ranges"""
+        """Load known threat IP ranges, each pre-parsed into an ip_network"""
         return [
             {
                 "range": "185.220.0.0/16",
+                "network": ipaddress.ip_network("185.220.0.0/16"),
                 "description": "Known Tor exit nodes range",
                 "category": ThreatCategory.SUSPICIOUS,
                 "severity": ThreatSeverity.MEDIUM
             },
             {
                 "range": "194.180.48.0/24",
+                "network": ipaddress.ip_network("194.180.48.0/24"),
                 "description": "Known botnet C&C range",
                 "category": ThreatCategory.BOTNET,
                 "severity": ThreatSeverity.HIGH
@@ -251,22 +389,24 @@ class LocalThreatIntelligence(ThreatIntelligenceProvider):
             )
         
         # Check suspicious patterns
-        for pattern_info in self.suspicious_patterns:
+        if not _may_match_suspicious_pattern(domain_lower):
+            return None
+        pattern_info = next((info for info in self.suspicious_patterns if info["check"](domain_lower)), None)
+        if pattern_info:
             pattern = pattern_info["pattern"]
-            if re.match(pattern, domain_lower):
-                return ThreatIntelligenceEntry(
-                    domain=domain,
-                    ip_address=None,
-                    category=ThreatCategory.SUSPICIOUS,
-                    severity=pattern_info["severity"],
-                    confidence=pattern_info["confidence"],
-                    source="pattern_analysis",
-                    description=pattern_info["description"],
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    indicators=[f"pattern_match:{pattern}"],
-                    metadata={"pattern": pattern}
-                )
+            return ThreatIntelligenceEntry(
+                domain=domain,
+                ip_address=None,
+                category=ThreatCategory.SUSPICIOUS,
+                severity=pattern_info["severity"],
+                confidence=pattern_info["confidence"],
+                source="pattern_analysis",
+                description=pattern_info["description"],
+                first_seen=datetime.utcnow(),
+                last_seen=datetime.utcnow(),
+                indicators=[f"pattern_match:{pattern}"],
+                metadata={"pattern": pattern}
+            )
         
         return None
     
@@ -277,9 +417,7 @@ class LocalThreatIntelligence(ThreatIntelligenceProvider):
         
         # Extract domain from URL
         try:
-            import urllib.parse
-            parsed = urllib.parse.urlparse(url)
-            domain = parsed.netloc.lower()
+            domain = _url_netloc(url)
             
             # First check domain
             domain_result = await self.lookup_domain(domain)
@@ -287,42 +425,21 @@ class LocalThreatIntelligence(ThreatIntelligenceProvider):
                 return domain_result
             
             # Check for suspicious URL patterns
-            suspicious_url_patterns = [
-                {
-                    "pattern": r".*bit\.ly.*",
-                    "description": "Shortened URL service",
-                    "severity": ThreatSeverity.MEDIUM,
-                    "confidence": 0.6
-                },
-                {
-                    "pattern": r".*\?.*=.*http.*",
-                    "description": "URL with suspicious redirect parameter",
-                    "severity": ThreatSeverity.HIGH,
-                    "confidence": 0.8
-                },
-                {
-                    "pattern": r".*\.(exe|bat|scr|com|pif)$",
-                    "description": "URL pointing to executable file",
-                    "severity": ThreatSeverity.CRITICAL,
-                    "confidence": 0.9
-                }
-            ]
-            
-            for pattern_info in suspicious_url_patterns:
-                if re.search(pattern_info["pattern"], url.lower()):
-                    return ThreatIntelligenceEntry(
-                        domain=domain,
-                        ip_address=None,
-                        category=ThreatCategory.SUSPICIOUS,
-                        severity=pattern_info["severity"],
-                        confidence=pattern_info["confidence"],
-                        source="url_analysis",
-                        description=f"Suspicious URL: {pattern_info['description']}",
-                        first_seen=datetime.utcnow(),
-                        last_seen=datetime.utcnow(),
-                        indicators=[f"url_pattern:{pattern_info['pattern']}"],
-                        metadata={"url": url, "pattern": pattern_info["pattern"]}
-                    )
+            pattern_info = _first_pattern_match(_FUSED_URL_RE, _SUSPICIOUS_URL_PATTERNS, url, search=True)
+            if pattern_info:
+                return ThreatIntelligenceEntry(
+                    domain=domain,
+                    ip_address=None,
+                    category=ThreatCategory.SUSPICIOUS,
+                    severity=pattern_info["severity"],
+                    confidence=pattern_info["confidence"],
+                    source="url_analysis",
+                    description=f"Suspicious URL: {pattern_info['description']}",
+                    first_seen=datetime.utcnow(),
+                    last_seen=datetime.utcnow(),
+                    indicators=[f"url_pattern:{pattern_info['pattern'].pattern}"],
+                    metadata={"url": url, "pattern": pattern_info["pattern"].pattern}
+                )
             
         except Exception as e:
             logger.error(f"Error analyzing URL {url}: {e}")
@@ -338,8 +455,7 @@ class LocalThreatIntelligence(ThreatIntelligenceProvider):
             ip_obj = ipaddress.ip_address(ip)
             
             for threat_range in self.threat_ip_ranges:
-                network = ipaddress.ip_network(threat_range["range"])
-                if ip_obj in network:
+                if ip_obj in threat_range["network"]:
                     return ThreatIntelligenceEntry(
                         domain="",
                         ip_address=ip,
@@ -424,6 +540,10 @@ class CommunityThreatIntelligence(ThreatIntelligenceProvider):
             logger.error(f"Error checking community intelligence for {domain}: {e}")
             return None
 
+# Lookup history is buffered and written with insert_many once either limit is reached
+LOOKUP_FLUSH_BATCH_SIZE = 100
+LOOKUP_FLUSH_INTERVAL = 5.0  # seconds
+
 class ThreatIntelligenceAggregator:
     """Aggregates threat intelligence from multiple sources"""
     
@@ -432,8 +552,13 @@ class ThreatIntelligenceAggregator:
             LocalThreatIntelligence(),
             CommunityThreatIntelligence()
         ]
-        self.cache = {}
+        self.cache: OrderedDict = OrderedDict()
         self.cache_ttl = 3600  # 1 hour cache
+        self._lookup_buffer: List[Dict[str, Any]] = []
+        # Created on first flush: before Python 3.10 a Lock binds to the loop current at construction
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._periodic_flush_task: Optional[asyncio.Task] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
     
     async def lookup_domain(self, domain: str) -> Dict[str, Any]:
         """Lookup domain across all threat intelligence sources"""
@@ -446,15 +571,17 @@ class ThreatIntelligenceAggregator:
         if cached_result:
             return cached_result
         
-        # Query all providers
+        # Query all providers concurrently
+        raw_results = await asyncio.gather(
+            *(provider.lookup_domain(domain) for provider in self.providers),
+            return_exceptions=True
+        )
         results = []
-        for provider in self.providers:
-            try:
-                result = await provider.lookup_domain(domain)
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error querying provider {provider.name} for domain {domain}: {e}")
+        for provider, result in zip(self.providers, raw_results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error querying provider {provider.name} for domain {domain}: {result}")
+            elif result:
+                results.append(result)
         
         # Aggregate results
         aggregated_result = self._aggregate_results(results, domain)
@@ -473,20 +600,22 @@ class ThreatIntelligenceAggregator:
             return self._create_safe_result(url)
         
         # Check cache first
-        cache_key = f"url:{hashlib.md5(url.encode()).hexdigest()}"
+        cache_key = _url_cache_key(url)
         cached_result = self._get_cached_result(cache_key)
         if cached_result:
             return cached_result
         
-        # Query all providers
+        # Query all providers concurrently
+        raw_results = await asyncio.gather(
+            *(provider.lookup_url(url) for provider in self.providers),
+            return_exceptions=True
+        )
         results = []
-        for provider in self.providers:
-            try:
-                result = await provider.lookup_url(url)
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error querying provider {provider.name} for URL {url}: {e}")
+        for provider, result in zip(self.providers, raw_results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error querying provider {provider.name} for URL {url}: {result}")
+            elif result:
+                results.append(result)
         
         # Aggregate results
         aggregated_result = self._aggregate_results(results, url)
@@ -583,47 +712,80 @@ class ThreatIntelligenceAggregator:
             }
         }
     
-    def _get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+    def _get_cached_result(self, cache_key: Hashable) -> Optional[Dict[str, Any]]:
         """Get result from cache if not expired"""
         if cache_key in self.cache:
             cached_data = self.cache[cache_key]
             if time.time() - cached_data["timestamp"] < self.cache_ttl:
+                self.cache.move_to_end(cache_key)
                 return cached_data["result"]
             else:
                 del self.cache[cache_key]
         return None
     
-    def _cache_result(self, cache_key: str, result: Dict[str, Any]):
+    def _cache_result(self, cache_key: Hashable, result: Dict[str, Any]):
         """Cache result with timestamp"""
         self.cache[cache_key] = {
             "result": result,
             "timestamp": time.time()
         }
+        self.cache.move_to_end(cache_key)
         
-        # Limit cache size
-        if len(self.cache) > 1000:
-            # Remove oldest entries
-            sorted_cache = sorted(self.cache.items(), key=lambda x: x[1]["timestamp"])
-            for key, _ in sorted_cache[:100]:  # Remove oldest 100
-                del self.cache[key]
+        # Limit cache size, evicting least recently used entries
+        while len(self.cache) > 1000:
+            self.cache.popitem(last=False)
     
     async def _store_lookup_result(self, target: str, lookup_type: str, result: Dict[str, Any]):
-        """Store lookup result in database for historical tracking"""
-        try:
-            db = get_database()
-            
-            lookup_record = {
-                "id": str(uuid.uuid4()),
-                "target": target,
-                "lookup_type": lookup_type,
-                "result": result,
-                "timestamp": datetime.utcnow()
-            }
-            
-            await db.threat_intelligence_lookups.insert_one(lookup_record)
-            
-        except Exception as e:
-            logger.error(f"Error storing lookup result: {e}")
+        """Buffer lookup result for batched storage in historical tracking"""
+        self._lookup_buffer.append({
+            "id": str(uuid.uuid4()),
+            "target": target,
+            "lookup_type": lookup_type,
+            "result": result,
+            "timestamp": datetime.utcnow()
+        })
+        
+        if self._periodic_flush_task is None or self._periodic_flush_task.done():
+            self._periodic_flush_task = asyncio.create_task(self._periodic_flush(LOOKUP_FLUSH_INTERVAL))
+        
+        if len(self._lookup_buffer) >= LOOKUP_FLUSH_BATCH_SIZE:
+            # Keep a reference so the task isn't garbage collected before it runs
+            task = asyncio.create_task(self.flush_lookup_results())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def flush_lookup_results(self):
+        """Write buffered lookup results to the database in one batch"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._lookup_buffer:
+                return
+            batch, self._lookup_buffer = self._lookup_buffer, []
+            try:
+                db = get_database()
+                await db.threat_intelligence_lookups.insert_many(batch, ordered=False)
+            except Exception as e:
+                logger.error(f"Error storing {len(batch)} lookup results: {e}")
+    
+    async def _periodic_flush(self, interval: float):
+        """Flush buffered lookup results every interval seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_lookup_results()
+    
+    async def close(self):
+        """Stop periodic flushing and write any buffered lookup results"""
+        if self._periodic_flush_task is not None:
+            self._periodic_flush_task.cancel()
+            try:
+                await self._periodic_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._periodic_flush_task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush_lookup_results()
 
 # Global threat intelligence aggregator
 threat_intelligence = ThreatIntelligenceAggregator()
@@ -652,6 +814,10 @@ async def check_url_reputation(url: str) -> Dict[str, Any]:
     """
     return await threat_intelligence.lookup_url(url)
 
+async def close_threat_intelligence():
+    """Flush buffered threat intelligence lookups; call on application shutdown"""
+    await threat_intelligence.close()
+
 async def submit_community_threat_report(
     domain: str,
     user_id: str,
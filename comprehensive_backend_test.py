@@ -1,40 +1,236 @@
 #!/usr/bin/env python3
 """
 Comprehensive Backend Testing Suite for Aman Cybersecurity Platform
-<<<<<<< HEAD
 Tests all critical backend functionality after applying fixes for local setup issues
-=======
-Tests core functionality after fixing React rendering error and backend issues
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+and the React rendering error
 """
 
+import argparse
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from types import SimpleNamespace
 import sys
 import os
 import time
-<<<<<<< HEAD
+import uuid
+import gc
+import sqlite3
+import functools
 import websocket
 import threading
-=======
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
 from datetime import datetime
 
+# AMAN_TEST_VERBOSE=0 keeps output to pass/fail lines and skips formatting result details
+VERBOSE = os.environ.get("AMAN_TEST_VERBOSE", "1") == "1"
+
+# Number of tests dispatched together; bounds peak memory on constrained CI runners
+BATCH_SIZE = int(os.environ.get("AMAN_TEST_BATCH", "6"))
+
+# SQLite file caching the registered test user between runs
+CACHE_PATH = os.environ.get("AMAN_TEST_CACHE", ".backend_test_cache.sqlite")
+
+# Per-test wall times from previous runs, used to submit the slowest tests first
+DURATIONS_PATH = os.path.expanduser(os.environ.get("AMAN_TEST_DURATIONS", "~/.cache/aman_test_durations.json"))
+
+# Machine-readable reports written alongside the console summary
+RESULTS_PATH = os.environ.get("AMAN_TEST_RESULTS", "/app/comprehensive_backend_test_results.json")
+JUNIT_PATH = os.environ.get("AMAN_TEST_JUNIT", "/app/comprehensive_backend_junit.xml")
+# Line-delimited results, appended as each test finishes so CI can tail a running suite
+NDJSON_PATH = os.environ.get("AMAN_TEST_NDJSON", "/app/comprehensive_results.ndjson")
+
+# Worker threads used to run the tests of an order-independent category concurrently
+MAX_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Core categories run at once after the prerequisites; each still batches its own tests
+CATEGORY_WORKERS = 4
+
+# Categories whose tests depend on running in the listed order (and so run serially)
+ORDERED_CATEGORIES = {"HEALTH CHECK & DATABASE", "AUTHENTICATION SYSTEM", "ISOLATED"}
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+# Response fields each endpoint must return
+HEALTH_REQUIRED = frozenset({'status', 'service', 'version', 'timestamp', 'checks'})
+LOGIN_REQUIRED = frozenset({'access_token', 'refresh_token', 'token_type'})
+STATS_REQUIRED = frozenset({'phishing_caught', 'safe_emails', 'potential_phishing', 'total_scans', 'accuracy_rate'})
+RECENT_EMAIL_REQUIRED = frozenset({'id', 'subject', 'sender', 'time', 'status', 'risk_score'})
+EMAIL_SCAN_REQUIRED = frozenset({'id', 'status', 'risk_score', 'explanation', 'threat_sources', 'detected_threats', 'recommendations'})
+LINK_SCAN_REQUIRED = frozenset({'url', 'status', 'risk_score', 'explanation', 'threat_categories', 'redirect_chain', 'is_shortened'})
+PROFILE_REQUIRED = frozenset({'id', 'name', 'email', 'organization', 'is_active', 'role'})
+USAGE_LIMIT_FIELDS = frozenset({'user_tier', 'within_limits', 'current_usage'})
+
+# Classification labels the scanners may return
+VALID_STATUSES = frozenset({'safe', 'phishing', 'potential_phishing'})
+
+def _json(response):
+    """Decode a JSON response body, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # Match response.json(), whose error is a RequestException that network_test reports
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    return response.json()
+
+def _dumps(payload):
+    """Encode a request body once, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+# Static request bodies, serialised once at import
+JSON_HEADERS = {"Content-Type": "application/json"}
+SUSPICIOUS_LINK_BODY = _dumps({
+    "url": "http://secure-bank-verification.com/verify-account?token=suspicious123&redirect=http://malicious-site.tk",
+    "context": "Click here to verify your account immediately to prevent suspension"
+})
+UPDATED_PROFILE_BODY = _dumps({
+    "name": "Sarah Johnson Updated",
+    "organization": "CyberSec Testing Corp Updated"
+})
+UPDATED_SETTINGS_BODY = _dumps({
+    "email_notifications": True,
+    "scan_notifications": True,
+    "weekly_reports": False,
+    "language": "en",
+    "timezone": "UTC",
+    "scan_sensitivity": "medium",
+    "auto_quarantine": False,
+    "share_threat_intelligence": True
+})
+
+# Endpoint paths, resolved against the backend URL once per tester
+ENDPOINTS = {
+    "health": "/health",
+    "register": "/auth/register",
+    "login": "/auth/login",
+    "refresh": "/auth/refresh",
+    "profile": "/user/profile",
+    "settings": "/user/settings",
+    "stats": "/dashboard/stats",
+    "recent_emails": "/dashboard/recent-emails",
+    "scan_email": "/scan/email",
+    "scan_link": "/scan/link",
+    "ai_cache_stats": "/ai/cache/stats",
+    "ai_usage_analytics": "/ai/usage/analytics",
+    "ai_usage_limits": "/ai/usage/limits",
+    "admin_stats": "/admin/dashboard/stats",
+}
+
 # Get backend URL from frontend environment
-def get_backend_url():
-    """Get the backend URL from frontend .env file"""
+@functools.lru_cache(maxsize=1)
+def load_frontend_env():
+    """Parse frontend/.env into a dict once per process"""
+    env = {}
     try:
         with open('/app/frontend/.env', 'r') as f:
-            for line in f:
-                if line.startswith('REACT_APP_BACKEND_URL='):
-                    return line.split('=', 1)[1].strip()
+            data = f.read()
     except Exception as e:
         print(f"❌ Error reading frontend .env: {e}")
-        return None
-    return None
+        return env
+    for line in data.splitlines():
+        if line.startswith('#'):
+            continue
+        key, sep, value = line.partition('=')
+        if sep:
+            env[key.strip()] = value.strip()
+    return env
+
+def get_backend_url():
+    """Get the backend URL from frontend .env file"""
+    return load_frontend_env().get('REACT_APP_BACKEND_URL')
+
+def load_durations(path=DURATIONS_PATH):
+    """Load recorded test durations, returning an empty mapping on first run"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_durations(durations, path=DURATIONS_PATH):
+    """Persist test durations for the next run's scheduling"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(durations, f, indent=2)
+    except OSError as e:
+        print(f"⚠️  Could not save test durations: {e}")
+
+def parse_shard(value):
+    """Parse an I/N shard spec (1-based) into a 0-based (index, count) tuple"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}")
+    return index - 1, count
+
+def needs_isolation(test_func):
+    """Mark a test that must run alone, after the tests sharing the logged-in user"""
+    test_func._needs_isolation = True
+    return test_func
+
+def requires_online(test_func):
+    """Mark a test that reaches external AI providers and only runs with --online"""
+    test_func._requires_online = True
+    return test_func
+
+def network_test(name):
+    """Log a failed result under name when a test raises a requests error"""
+    def decorator(test_func):
+        @functools.wraps(test_func)
+        def wrapper(self):
+            try:
+                return test_func(self)
+            except requests.exceptions.RequestException as e:
+                self.log_result(name, False, f"Request failed: {str(e)}")
+                return False
+        return wrapper
+    return decorator
+
+@dataclass
+class TestResult:
+    """Outcome of a single test"""
+    __test__ = False  # not a pytest test class
+    # Declared by hand since dataclass(slots=True) needs Python 3.10
+    __slots__ = ('test', 'success', 'details', 'ts_ns', 'duration_ns')
+    
+    test: str
+    success: bool
+    details: str
+    ts_ns: int  # monotonic nanoseconds since the tester started
+    duration_ns: int  # time since the test started, or since its previous result
 
 class ComprehensiveBackendTester:
-    def __init__(self):
+    __slots__ = (
+        'online', 'shard', 'backend_url', 'urls', 'session', 'cache', 'results', '_ndjson', 't0', '_mono0', '_tls', '_lock', '_log_q', 'progress', 'durations',
+        'health_data', 'baseline_rtt', 'timeout', 'ai_timeout', 'auth_token', 'refresh_token',
+        'admin_token', 'test_user_id', 'test_user_data', 'admin_user_data', 'phishing_email_body',
+    )
+    
+    def __init__(self, online=False, shard=(0, 1)):
+        self.online = online
+        # (index, count): this process runs every count-th core category starting at index
+        self.shard = shard
         self.backend_url = get_backend_url()
         if not self.backend_url:
             print("❌ Could not determine backend URL from frontend/.env")
@@ -45,1171 +241,1163 @@ class ComprehensiveBackendTester:
             self.backend_url = f"{self.backend_url}/api"
             
         print(f"🔗 Testing backend at: {self.backend_url}")
+        self.urls = SimpleNamespace(**{name: f"{self.backend_url}{path}" for name, path in ENDPOINTS.items()})
+        
+        # One pooled session for every test so connections are reused instead of re-handshaken
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        atexit.register(self.session.close)
         self.results = []
+        # Wall-clock anchor for the monotonic result timestamps
+        self.t0 = time.time()
+        self._mono0 = time.monotonic_ns()
+        # Per-thread start of the running test, so each result can carry its duration
+        self._tls = threading.local()
+        try:
+            self._ndjson = open(self.shard_path(NDJSON_PATH), 'w', buffering=1)
+            atexit.register(self._ndjson.close)
+            # Result lines carry ts_ns since this header's t0, so readers can map them to wall time
+            self._ndjson.write(_dumps({
+                't0': self.t0,
+                'started_at': datetime.fromtimestamp(self.t0).isoformat()
+            }).decode('utf-8') + "\n")
+        except OSError as e:
+            print(f"⚠️  Could not open results log {NDJSON_PATH}: {e}")
+            self._ndjson = None
+        # Registered user and tokens persisted across runs, keyed by backend URL
+        # Per shard, since parallel shards each register their own user and would race on one file
+        self.cache = sqlite3.connect(self.shard_path(CACHE_PATH), check_same_thread=False)
+        self.cache.execute("CREATE TABLE IF NOT EXISTS fixtures (key TEXT PRIMARY KEY, payload BLOB, updated REAL)")
+        self._lock = threading.Lock()
+        # Progress output goes through a queue drained by one writer thread
+        self._log_q = queue.Queue()
+        self.progress = None
+        threading.Thread(target=self._drain_log, daemon=True).start()
+        self.durations = load_durations(self.shard_path(DURATIONS_PATH))
+        self.health_data = None
+        # Conservative until test_basic_health_check measures the real round-trip time
+        self.baseline_rtt = None
+        self.timeout = (2.0, 10.0)
+        self.ai_timeout = (2.0, 15.0)
         self.auth_token = None
-<<<<<<< HEAD
+        self.refresh_token = None
         self.admin_token = None
-=======
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+        self.test_user_id = None
         self.test_user_data = {
             "name": "Sarah Johnson",
-            "email": f"sarah.johnson.{int(time.time())}@cybersectest.com",
+            # Random suffix, so shards started in the same second don't register the same user
+            "email": f"sarah.johnson.{uuid.uuid4().hex[:12]}@cybersectest.com",
             "password": "SecurePass123!",
             "organization": "CyberSec Testing Corp"
         }
-<<<<<<< HEAD
         self.admin_user_data = {
             "name": "Admin User",
-            "email": f"admin.{int(time.time())}@cybersectest.com", 
+            "email": f"admin.{uuid.uuid4().hex[:12]}@cybersectest.com",
             "password": "AdminPass123!",
             "organization": "Admin Organization"
         }
-=======
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+        self.phishing_email_body = self._encode_phishing_email_body()
         
+    def _encode_phishing_email_body(self):
+        """Encode the phishing scan body for the current test user's address"""
+        # Depends on the recipient, so encoded once per user rather than per call
+        return _dumps({
+            "email_subject": "URGENT: Account Security Alert - Immediate Action Required",
+            "email_body": "Dear Customer, Your account has been compromised and will be suspended in 24 hours. Click here to verify your identity: http://secure-bank-verification.com/verify?token=urgent123. Please provide your login credentials immediately to prevent account closure. This is urgent and requires immediate action.",
+            "sender": "security@secure-bank-verification.com",
+            "recipient": self.test_user_data["email"]
+        })
+
+    def _drain_log(self):
+        """Write queued progress lines to stdout off the test critical path"""
+        while True:
+            msg = self._log_q.get()
+            if self.progress is not None:
+                # Keep result lines from tearing the progress bar
+                self.progress.write(msg, file=sys.stdout)
+            else:
+                sys.stdout.write(msg + "\n")
+                sys.stdout.flush()
+            self._log_q.task_done()
+
+    def emit(self, msg):
+        """Queue a progress line for the writer thread"""
+        self._log_q.put(msg)
+
     def log_result(self, test_name, success, details):
         """Log test result"""
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} {test_name}")
-        if details:
-            print(f"   Details: {details}")
-        
-        self.results.append({
-            'test': test_name,
-            'success': success,
-            'details': details,
-            'timestamp': datetime.now().isoformat()
-        })
+        # One queued message per result so concurrent tests don't interleave lines
+        msg = f"{status} {test_name}"
+        if details and VERBOSE:
+            msg += f"\n   Details: {details}"
+        self.emit(msg)
+        
+        now = time.monotonic_ns()
+        # A test that logs several results splits its time between them
+        started = getattr(self._tls, 'started_ns', now)
+        self._tls.started_ns = now
+        
+        with self._lock:
+            result = TestResult(test_name, success, details, now - self._mono0, now - started)
+            self.results.append(result)
+            if self._ndjson is not None:
+                self._ndjson.write(_dumps({
+                    'test': result.test,
+                    'success': result.success,
+                    'details': result.details,
+                    'ts_ns': result.ts_ns
+                }).decode('utf-8') + "\n")
     
-<<<<<<< HEAD
-    def get_auth_headers(self, admin=False):
-        """Get authorization headers for authenticated requests"""
-        token = self.admin_token if admin else self.auth_token
-        if token:
-            return {"Authorization": f"Bearer {token}"}
-        return {}
+    def post_concurrently(self, url, payloads, headers, timeout):
+        """POST each payload to the same endpoint at once and return the responses in payload order"""
+        with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+            futures = [executor.submit(self.session.post, url, json=payload, headers=headers, timeout=timeout)
+                       for payload in payloads]
+            # result() re-raises RequestException into the test's network_test wrapper
+            return [future.result() for future in futures]
 
-    # 1. Test Database Connection
-    def test_database_connection(self):
-        """Test MongoDB database connection and health"""
-=======
-    def get_auth_headers(self):
-        """Get authorization headers for authenticated requests"""
-        if self.auth_token:
-            return {"Authorization": f"Bearer {self.auth_token}"}
+    @staticmethod
+    def _short_body(response):
+        """First 512 bytes of an error body, without decoding the whole payload"""
+        return response.content[:512].decode('utf-8', 'replace')
+
+    def set_timeouts(self, baseline_rtt):
+        """Scale (connect, read) timeouts to the measured /health latency"""
+        self.baseline_rtt = baseline_rtt
+        self.timeout = (2.0, max(3.0, baseline_rtt * 10))
+        # Scans wait on AI providers, so they get a larger read budget
+        self.ai_timeout = (2.0, max(8.0, baseline_rtt * 25))
+
+    def set_auth_token(self, token):
+        """Store the user's access token and attach it to every session request"""
+        self.auth_token = token
+        self.session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def get_auth_headers(self, admin=False):
+        """Get per-request authorization headers; the session already carries the user's token"""
+        if admin and self.admin_token:
+            return {"Authorization": f"Bearer {self.admin_token}"}
         return {}
 
     # 1. HEALTH CHECK & DATABASE TESTS
+    @network_test("Basic Health Check")
     def test_basic_health_check(self):
         """Test basic health endpoint functionality"""
-        try:
-            response = requests.get(f"{self.backend_url}/health", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['status', 'service', 'version', 'timestamp', 'checks']
-                
-                if all(field in data for field in required_fields):
-                    checks = data.get('checks', {})
-                    if 'database' in checks and 'api' in checks:
-                        db_status = checks['database']
-                        api_status = checks['api']
-                        self.log_result("Basic Health Check", True, 
-                                      f"Status: {data['status']}, DB: {db_status}, API: {api_status}")
-                        return True
-                    else:
-                        self.log_result("Basic Health Check", False, "Missing system checks")
-                        return False
-                else:
-                    self.log_result("Basic Health Check", False, f"Missing fields: {required_fields}")
-                    return False
-            else:
-                self.log_result("Basic Health Check", False, f"HTTP {response.status_code}: {response.text}")
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Basic Health Check", False, f"Request failed: {str(e)}")
-            return False
-
-    def test_database_connectivity(self):
-        """Test database connectivity through health endpoint"""
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
-        try:
-            response = requests.get(f"{self.backend_url}/health", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
+        response = self.session.get(self.urls.health, timeout=self.timeout)
+        
+        if response.status_code == 200:
+            data = _json(response)
+            # Shared with test_database_connectivity so /health is only fetched once
+            self.health_data = data
+            self.set_timeouts(response.elapsed.total_seconds())
+            missing_fields = HEALTH_REQUIRED - data.keys()
+            
+            if not missing_fields:
                 checks = data.get('checks', {})
-                db_status = checks.get('database', 'unknown')
-                
-                if db_status == 'healthy':
-<<<<<<< HEAD
-                    self.log_result("Database Connection", True, 
-                                  f"MongoDB connected successfully - Status: {data['status']}")
+                if 'database' in checks and 'api' in checks:
+                    db_status = checks['database']
+                    api_status = checks['api']
+                    self.log_result("Basic Health Check", True, 
+                                  f"Status: {data['status']}, DB: {db_status}, API: {api_status}")
                     return True
                 else:
-                    self.log_result("Database Connection", False, 
-                                  f"Database unhealthy - Status: {db_status}")
+                    self.log_result("Basic Health Check", False, "Missing system checks")
                     return False
             else:
-                self.log_result("Database Connection", False, 
-                              f"Health check failed: HTTP {response.status_code}")
+                self.log_result("Basic Health Check", False, f"Missing fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Database Connection", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Basic Health Check", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 2. Test Authentication System
-    def test_authentication_system(self):
-        """Test complete JWT authentication system"""
-        try:
-            # Test user registration
-            registration_data = {
-                "name": self.test_user_data["name"],
-                "email": self.test_user_data["email"],
-                "password": self.test_user_data["password"],
-                "organization": self.test_user_data["organization"]
-            }
-            
-            reg_response = requests.post(
-                f"{self.backend_url}/auth/register",
-                json=registration_data,
-                timeout=10
-            )
-            
-            if reg_response.status_code != 200:
-                self.log_result("Authentication System", False, 
-                              f"Registration failed: HTTP {reg_response.status_code}")
-                return False
-            
-            # Test user login
-=======
-                    self.log_result("Database Connectivity", True, "MongoDB connection healthy")
-                    return True
-                else:
-                    self.log_result("Database Connectivity", False, f"Database status: {db_status}")
-                    return False
-            else:
+    @network_test("Database Connectivity")
+    def test_database_connectivity(self):
+        """Test database connectivity through health endpoint"""
+        data = self.health_data
+        if data is None:
+            # Only hit /health again if the basic health check didn't run first
+            response = self.session.get(self.urls.health, timeout=self.timeout)
+            if response.status_code != 200:
                 self.log_result("Database Connectivity", False, f"Health check failed: HTTP {response.status_code}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Database Connectivity", False, f"Request failed: {str(e)}")
+            data = _json(response)
+            
+        checks = data.get('checks', {})
+        db_status = checks.get('database', 'unknown')
+        
+        if db_status == 'healthy':
+            self.log_result("Database Connectivity", True, "MongoDB connection healthy")
+            return True
+        else:
+            self.log_result("Database Connectivity", False, f"Database status: {db_status}")
             return False
 
     # 2. AUTHENTICATION SYSTEM TESTS
+    @network_test("User Registration")
     def test_user_registration(self):
         """Test user registration with validation"""
-        try:
-            response = requests.post(
-                f"{self.backend_url}/auth/register",
-                json=self.test_user_data,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'message' in data and 'data' in data:
-                    user_data = data.get('data', {})
-                    if 'user_id' in user_data and 'email' in user_data:
-                        self.log_result("User Registration", True, f"User registered: {user_data['email']}")
-                        return True
-                    else:
-                        self.log_result("User Registration", False, "Missing user data in response")
-                        return False
+        response = self.session.post(
+            self.urls.register,
+            json=self.test_user_data,
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 200:
+            data = _json(response)
+            if 'message' in data and 'data' in data:
+                user_data = data.get('data', {})
+                if 'user_id' in user_data and 'email' in user_data:
+                    self.log_result("User Registration", True, f"User registered: {user_data['email']}")
+                    return True
                 else:
-                    self.log_result("User Registration", False, f"Invalid response format: {data}")
+                    self.log_result("User Registration", False, "Missing user data in response")
                     return False
             else:
-                self.log_result("User Registration", False, f"HTTP {response.status_code}: {response.text}")
+                if VERBOSE:
+                    self.emit(f"   Response: {data}")
+                self.log_result("User Registration", False, "Invalid response format")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("User Registration", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("User Registration", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
+    @network_test("User Login")
     def test_user_login(self):
         """Test user login and JWT token generation"""
-        try:
-            login_data = {
-                "email": self.test_user_data["email"],
-                "password": self.test_user_data["password"]
-            }
-            
-            response = requests.post(
-                f"{self.backend_url}/auth/login",
-                json=login_data,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['access_token', 'refresh_token', 'token_type']
-                
-                if all(field in data for field in required_fields):
-                    self.auth_token = data['access_token']
-                    self.log_result("User Login", True, f"Login successful, token type: {data['token_type']}")
-                    return True
-                else:
-                    self.log_result("User Login", False, f"Missing token fields: {required_fields}")
-                    return False
+        response = self.session.post(
+            self.urls.login,
+            json={"email": self.test_user_data["email"], "password": self.test_user_data["password"]},
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 200:
+            data = _json(response)
+            missing_fields = LOGIN_REQUIRED - data.keys()
+            
+            if not missing_fields:
+                self.set_auth_token(data['access_token'])
+                self.refresh_token = data['refresh_token']
+                self.store_cached_user()
+                self.log_result("User Login", True, f"Login successful, token type: {data['token_type']}")
+                return True
             else:
-                self.log_result("User Login", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("User Login", False, f"Missing token fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("User Login", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("User Login", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
+    @network_test("Token Refresh")
     def test_token_refresh(self):
         """Test JWT token refresh mechanism"""
-        try:
-            # First login to get refresh token
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
-            login_data = {
-                "email": self.test_user_data["email"],
-                "password": self.test_user_data["password"]
-            }
-            
-            login_response = requests.post(
-                f"{self.backend_url}/auth/login",
-                json=login_data,
-                timeout=10
-            )
-            
-<<<<<<< HEAD
-            if login_response.status_code == 200:
-                login_data = login_response.json()
-                if 'access_token' in login_data and 'refresh_token' in login_data:
-                    self.auth_token = login_data['access_token']
-                    
-                    # Test token refresh
-                    refresh_data = {"refresh_token": login_data['refresh_token']}
-                    refresh_response = requests.post(
-                        f"{self.backend_url}/auth/refresh",
-                        json=refresh_data,
-                        timeout=10
-                    )
-                    
-                    if refresh_response.status_code == 200:
-                        self.log_result("Authentication System", True, 
-                                      "Registration, login, and token refresh working")
-                        return True
-                    else:
-                        self.log_result("Authentication System", False, 
-                                      f"Token refresh failed: HTTP {refresh_response.status_code}")
-                        return False
-                else:
-                    self.log_result("Authentication System", False, "Missing tokens in login response")
-                    return False
-            else:
-                self.log_result("Authentication System", False, 
-                              f"Login failed: HTTP {login_response.status_code}")
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Authentication System", False, f"Request failed: {str(e)}")
+        # Reuse the refresh token captured by test_user_login instead of logging in again
+        if not self.refresh_token:
+            self.log_result("Token Refresh", False, "No refresh token cached from login")
             return False
-
-    # 3. Test AI-Enhanced Email Scanning
-    def test_ai_enhanced_email_scanning(self):
-        """Test AI-powered email scanning with fallback mechanism"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test 1: Legitimate email
-            legitimate_email = {
-                "email_subject": "Monthly Newsletter - Company Updates",
-                "email_body": "Dear Team, Here are this month's company updates and achievements. We've successfully completed several projects and are looking forward to the upcoming quarter. Best regards, HR Team",
-                "sender": "hr@company.com",
-                "recipient": self.test_user_data["email"]
-            }
-            
-            response1 = requests.post(
-                f"{self.backend_url}/scan/email",
-                json=legitimate_email,
-                headers=headers,
-                timeout=15
-            )
-            
-            # Test 2: Phishing email
-            phishing_email = {
-                "email_subject": "URGENT: Account Suspended - Verify Now!",
-                "email_body": "Your account has been suspended due to suspicious activity. Click here immediately to verify: http://fake-bank-security.com/verify?urgent=true. Enter your login credentials to prevent permanent closure. This is time-sensitive!",
-                "sender": "security@fake-bank-security.com",
-                "recipient": self.test_user_data["email"]
-            }
-            
-            response2 = requests.post(
-                f"{self.backend_url}/scan/email",
-                json=phishing_email,
-                headers=headers,
-                timeout=15
-            )
-            
-            # Test 3: Urgency manipulation email
-            urgency_email = {
-                "email_subject": "Action Required: Account Will Be Closed in 24 Hours",
-                "email_body": "URGENT ACTION REQUIRED! Your account will be permanently closed in 24 hours unless you verify your identity immediately. Click here now: http://urgent-verification.tk/verify. Don't delay - act now!",
-                "sender": "urgent@verification-center.com",
-                "recipient": self.test_user_data["email"]
-            }
-            
-            response3 = requests.post(
-                f"{self.backend_url}/scan/email",
-                json=urgency_email,
-                headers=headers,
-                timeout=15
-            )
             
-            # Analyze results
-            if all(r.status_code == 200 for r in [response1, response2, response3]):
-                data1, data2, data3 = response1.json(), response2.json(), response3.json()
-                
-                # Check if AI scanning is working properly
-                legitimate_safe = data1.get('risk_score', 100) <= 30 and data1.get('status') == 'safe'
-                phishing_detected = data2.get('risk_score', 0) >= 70 and data2.get('status') in ['phishing', 'potential_phishing']
-                urgency_detected = data3.get('risk_score', 0) >= 70 and data3.get('status') in ['phishing', 'potential_phishing']
-                
-                # Check for AI-powered features
-                has_explanations = all(len(d.get('explanation', '')) > 20 for d in [data1, data2, data3])
-                has_recommendations = all(len(d.get('recommendations', [])) > 0 for d in [data2, data3])
-                
-                if legitimate_safe and phishing_detected and urgency_detected and has_explanations:
-                    self.log_result("AI-Enhanced Email Scanning", True, 
-                                  f"AI scanning working - Legitimate: {data1['risk_score']:.1f}, Phishing: {data2['risk_score']:.1f}, Urgency: {data3['risk_score']:.1f}")
-                    return True
-                else:
-                    self.log_result("AI-Enhanced Email Scanning", False, 
-                                  f"AI detection issues - Legitimate: {data1['risk_score']:.1f}, Phishing: {data2['risk_score']:.1f}, Urgency: {data3['risk_score']:.1f}")
-                    return False
+        # Test refresh endpoint
+        refresh_data = {"refresh_token": self.refresh_token}
+        response = self.session.post(
+            self.urls.refresh,
+            json=refresh_data,
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 200:
+            data = _json(response)
+            if 'access_token' in data and 'refresh_token' in data:
+                self.log_result("Token Refresh", True, "Token refresh successful")
+                return True
             else:
-                status_codes = [r.status_code for r in [response1, response2, response3]]
-                self.log_result("AI-Enhanced Email Scanning", False, 
-                              f"HTTP errors: {status_codes}")
+                self.log_result("Token Refresh", False, "Missing tokens in refresh response")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("AI-Enhanced Email Scanning", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Token Refresh", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 4. Test AI-Enhanced Link Scanning
-    def test_ai_enhanced_link_scanning(self):
-        """Test AI-powered link scanning with threat detection"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test 1: Legitimate URL
-            legitimate_link = {
-                "url": "https://www.google.com",
-                "context": "Search engine link"
-            }
-            
-            response1 = requests.post(
-                f"{self.backend_url}/scan/link",
-                json=legitimate_link,
-                headers=headers,
-                timeout=15
-            )
-            
-            # Test 2: Malicious URL
-            malicious_link = {
-                "url": "http://phishing-site-example.tk/login?redirect=malicious.com",
-                "context": "Suspicious login page found in email"
-            }
-            
-            response2 = requests.post(
-                f"{self.backend_url}/scan/link",
-                json=malicious_link,
-                headers=headers,
-                timeout=15
-            )
-            
-            # Test 3: Shortened URLs
-            shortened_links = [
-                {"url": "http://bit.ly/suspicious123", "context": "Shortened URL in email"},
-                {"url": "http://tinyurl.com/malicious456", "context": "Tiny URL redirect"},
-                {"url": "http://t.co/phishing789", "context": "Twitter shortened link"}
-            ]
-            
-            shortened_responses = []
-            for link in shortened_links:
-                resp = requests.post(
-                    f"{self.backend_url}/scan/link",
-                    json=link,
-                    headers=headers,
-                    timeout=15
-                )
-                shortened_responses.append(resp)
-            
-            # Analyze results
-            if response1.status_code == 200 and response2.status_code == 200:
-                data1, data2 = response1.json(), response2.json()
-                
-                # Check AI link analysis
-                legitimate_safe = data1.get('risk_score', 100) <= 30 and data1.get('status') == 'safe'
-                malicious_detected = data2.get('risk_score', 0) >= 70 and data2.get('status') in ['phishing', 'potential_phishing']
-                
-                # Check shortened URL detection
-                shortened_detected = 0
-                for resp in shortened_responses:
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data.get('is_shortened', False):
-                            shortened_detected += 1
-                
-                if legitimate_safe and malicious_detected and shortened_detected >= 2:
-                    self.log_result("AI-Enhanced Link Scanning", True, 
-                                  f"AI link scanning working - Legitimate: {data1['risk_score']:.1f}, Malicious: {data2['risk_score']:.1f}, Shortened detected: {shortened_detected}/3")
+    # 3. DASHBOARD API TESTS
+    @network_test("Dashboard Stats")
+    def test_dashboard_stats(self):
+        """Test dashboard statistics API"""
+        headers = self.get_auth_headers()
+        response = self.session.get(self.urls.stats, headers=headers, timeout=self.timeout)
+        
+        if response.status_code == 200:
+            data = _json(response)
+            missing_fields = STATS_REQUIRED - data.keys()
+            
+            if not missing_fields:
+                # Verify data types
+                if (isinstance(data['phishing_caught'], int) and 
+                    isinstance(data['safe_emails'], int) and 
+                    isinstance(data['potential_phishing'], int) and
+                    isinstance(data['total_scans'], int) and
+                    isinstance(data['accuracy_rate'], (int, float))):
+                    self.log_result("Dashboard Stats", True, 
+                                  f"Stats: Phishing={data['phishing_caught']}, Safe={data['safe_emails']}, Total={data['total_scans']}")
                     return True
                 else:
-                    self.log_result("AI-Enhanced Link Scanning", False, 
-                                  f"AI link detection issues - Legitimate: {data1['risk_score']:.1f}, Malicious: {data2['risk_score']:.1f}, Shortened: {shortened_detected}/3")
+                    self.log_result("Dashboard Stats", False, "Invalid data types in response")
                     return False
             else:
-                self.log_result("AI-Enhanced Link Scanning", False, 
-                              f"HTTP errors: {response1.status_code}, {response2.status_code}")
+                self.log_result("Dashboard Stats", False, f"Missing fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("AI-Enhanced Link Scanning", False, f"Request failed: {str(e)}")
+        elif response.status_code == 401 or response.status_code == 403:
+            self.log_result("Dashboard Stats", False, "Authentication required")
+            return False
+        else:
+            self.log_result("Dashboard Stats", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 5. Test Dashboard Endpoints
-    def test_dashboard_endpoints(self):
-        """Test user dashboard statistics and recent emails"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test dashboard stats
-            stats_response = requests.get(f"{self.backend_url}/dashboard/stats", headers=headers, timeout=10)
-            
-            if stats_response.status_code == 200:
-                stats_data = stats_response.json()
-                required_fields = ['phishing_caught', 'safe_emails', 'potential_phishing', 'total_scans', 'accuracy_rate']
-                
-                if all(field in stats_data for field in required_fields):
-                    # Test recent emails
-                    emails_response = requests.get(f"{self.backend_url}/dashboard/recent-emails", headers=headers, timeout=10)
+    @network_test("Recent Emails API")
+    def test_recent_emails_api(self):
+        """Test recent emails API"""
+        headers = self.get_auth_headers()
+        response = self.session.get(self.urls.recent_emails, headers=headers, timeout=self.timeout)
+        
+        if response.status_code == 200:
+            data = _json(response)
+            
+            if 'emails' in data and isinstance(data['emails'], list):
+                emails = data['emails']
+                if len(emails) > 0:
+                    # Check first email structure
+                    first_email = emails[0]
+                    missing_fields = RECENT_EMAIL_REQUIRED - first_email.keys()
                     
-                    if emails_response.status_code == 200:
-                        emails_data = emails_response.json()
+                    if not missing_fields:
+                        invalid_statuses = {email.get('status') for email in emails} - VALID_STATUSES
                         
-                        if 'emails' in emails_data and isinstance(emails_data['emails'], list):
-                            self.log_result("Dashboard Endpoints", True, 
-                                          f"Dashboard working - Stats: {stats_data['total_scans']} scans, {stats_data['accuracy_rate']}% accuracy, {len(emails_data['emails'])} recent emails")
+                        if not invalid_statuses:
+                            self.log_result("Recent Emails API", True, 
+                                          f"Retrieved {len(emails)} emails with valid structure")
                             return True
                         else:
-                            self.log_result("Dashboard Endpoints", False, "Recent emails format invalid")
+                            self.log_result("Recent Emails API", False, f"Invalid status values: {sorted(map(str, invalid_statuses))}")
                             return False
                     else:
-                        self.log_result("Dashboard Endpoints", False, f"Recent emails failed: HTTP {emails_response.status_code}")
+                        self.log_result("Recent Emails API", False, f"Missing fields in email: {sorted(missing_fields)}")
                         return False
                 else:
-                    missing = [f for f in required_fields if f not in stats_data]
-                    self.log_result("Dashboard Endpoints", False, f"Missing stats fields: {missing}")
-                    return False
+                    self.log_result("Recent Emails API", True, "Empty email list (valid for new user)")
+                    return True
             else:
-                self.log_result("Dashboard Endpoints", False, f"Dashboard stats failed: HTTP {stats_response.status_code}")
+                self.log_result("Recent Emails API", False, "Response missing 'emails' array")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Dashboard Endpoints", False, f"Request failed: {str(e)}")
+        elif response.status_code == 401 or response.status_code == 403:
+            self.log_result("Recent Emails API", False, "Authentication required")
+            return False
+        else:
+            self.log_result("Recent Emails API", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 6. Test WebSocket Health
-    def test_websocket_health(self):
-        """Test WebSocket connection for real-time features"""
-        try:
-            # Get user ID from profile first
-            headers = self.get_auth_headers()
-            profile_response = requests.get(f"{self.backend_url}/user/profile", headers=headers, timeout=10)
-            
-            if profile_response.status_code != 200:
-                self.log_result("WebSocket Health", False, "Could not get user profile for WebSocket test")
-                return False
-            
-            user_id = profile_response.json().get('id')
-            if not user_id:
-                self.log_result("WebSocket Health", False, "No user ID in profile response")
-                return False
-            
-            # Test WebSocket connection
-            ws_url = self.backend_url.replace('http', 'ws').replace('/api', f'/api/ws/{user_id}')
-            
-            connection_successful = False
-            connection_error = None
-            
-            def on_open(ws):
-                nonlocal connection_successful
-                connection_successful = True
-                # Send a ping message
-                ws.send(json.dumps({"type": "ping"}))
-            
-            def on_message(ws, message):
-                try:
-                    data = json.loads(message)
-                    if data.get("type") == "pong":
-                        ws.close()
-                except:
-                    pass
-            
-            def on_error(ws, error):
-                nonlocal connection_error
-                connection_error = str(error)
-            
-            try:
-                ws = websocket.WebSocketApp(ws_url,
-                                          on_open=on_open,
-                                          on_message=on_message,
-                                          on_error=on_error)
-                
-                # Run WebSocket in a separate thread with timeout
-                ws_thread = threading.Thread(target=ws.run_forever)
-                ws_thread.daemon = True
-                ws_thread.start()
-                
-                # Wait for connection
-                time.sleep(2)
+    # 4. AI INTEGRATION TESTS
+    @requires_online
+    @network_test("AI Email Scanning")
+    def test_ai_email_scanning(self):
+        """Test AI-powered email scanning"""
+        headers = self.get_auth_headers()
+        
+        # Test with phishing email (body encoded once in __init__)
+        response = self.session.post(
+            self.urls.scan_email,
+            data=self.phishing_email_body,
+            headers={**headers, **JSON_HEADERS},
+            timeout=self.ai_timeout
+        )
+        
+        if response.status_code == 200:
+            data = _json(response)
+            missing_fields = EMAIL_SCAN_REQUIRED - data.keys()
+            
+            if not missing_fields:
+                risk_score = data.get('risk_score', 0)
+                status = data.get('status')
+                explanation = data.get('explanation', '')
                 
-                if connection_successful:
-                    self.log_result("WebSocket Health", True, "WebSocket connection and ping/pong working")
+                # Verify AI scanning is working
+                if (isinstance(risk_score, (int, float)) and 
+                    status in VALID_STATUSES and
+                    len(explanation) > 20):
+                    self.log_result("AI Email Scanning", True, 
+                                  f"AI scan completed: Risk={risk_score:.1f}, Status={status}")
                     return True
                 else:
-                    self.log_result("WebSocket Health", False, f"WebSocket connection failed: {connection_error}")
+                    self.log_result("AI Email Scanning", False, 
+                                  f"AI scanning not working properly: Risk={risk_score}, Status={status}")
                     return False
-                    
-            except Exception as e:
-                self.log_result("WebSocket Health", False, f"WebSocket test failed: {str(e)}")
+            else:
+                self.log_result("AI Email Scanning", False, f"Missing response fields: {sorted(missing_fields)}")
                 return False
-                
-        except Exception as e:
-            self.log_result("WebSocket Health", False, f"WebSocket setup failed: {str(e)}")
+        elif response.status_code == 401 or response.status_code == 403:
+            self.log_result("AI Email Scanning", False, "Authentication required")
+            return False
+        else:
+            self.log_result("AI Email Scanning", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 7. Test Admin Panel
-    def test_admin_panel(self):
-        """Test admin dashboard endpoints with proper role-based access"""
-        try:
-            # First test with regular user (should be denied)
-            headers = self.get_auth_headers()
-            
-            admin_stats_response = requests.get(f"{self.backend_url}/admin/dashboard/stats", headers=headers, timeout=10)
-            
-            if admin_stats_response.status_code == 403:
-                # Test admin endpoints structure (even though we can't access them)
-                admin_endpoints = [
-                    "/admin/dashboard/stats",
-                    "/admin/users",
-                    "/admin/threats",
-                    "/admin/system/monitoring",
-                    "/admin/audit/log"
-                ]
-                
-                access_denied_count = 0
-                for endpoint in admin_endpoints:
-                    response = requests.get(f"{self.backend_url}{endpoint}", headers=headers, timeout=10)
-                    if response.status_code == 403:
-                        access_denied_count += 1
+    @requires_online
+    @network_test("AI Link Scanning")
+    def test_ai_link_scanning(self):
+        """Test AI-powered link scanning"""
+        headers = self.get_auth_headers()
+        
+        # Test with suspicious link
+        response = self.session.post(
+            self.urls.scan_link,
+            data=SUSPICIOUS_LINK_BODY,
+            headers={**headers, **JSON_HEADERS},
+            timeout=self.ai_timeout
+        )
+        
+        if response.status_code == 200:
+            data = _json(response)
+            missing_fields = LINK_SCAN_REQUIRED - data.keys()
+            
+            if not missing_fields:
+                risk_score = data.get('risk_score', 0)
+                status = data.get('status')
+                explanation = data.get('explanation', '')
                 
-                if access_denied_count == len(admin_endpoints):
-                    self.log_result("Admin Panel", True, 
-                                  f"Admin panel properly protected - All {len(admin_endpoints)} endpoints deny regular user access")
+                # Verify AI link scanning is working
+                if (isinstance(risk_score, (int, float)) and 
+                    status in VALID_STATUSES and
+                    len(explanation) > 20):
+                    self.log_result("AI Link Scanning", True, 
+                                  f"AI link scan completed: Risk={risk_score:.1f}, Status={status}")
                     return True
                 else:
-                    self.log_result("Admin Panel", False, 
-                                  f"Admin panel security issue - Only {access_denied_count}/{len(admin_endpoints)} endpoints properly protected")
+                    self.log_result("AI Link Scanning", False, 
+                                  f"AI link scanning not working properly: Risk={risk_score}, Status={status}")
                     return False
             else:
-                self.log_result("Admin Panel", False, 
-                              f"Admin panel not properly protected - Regular user got HTTP {admin_stats_response.status_code}")
+                self.log_result("AI Link Scanning", False, f"Missing response fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Admin Panel", False, f"Request failed: {str(e)}")
+        elif response.status_code == 401 or response.status_code == 403:
+            self.log_result("AI Link Scanning", False, "Authentication required")
+            return False
+        else:
+            self.log_result("AI Link Scanning", False, f"HTTP {response.status_code}: {self._short_body(response)}")
             return False
 
-    # 8. Test AI Usage Analytics
-    def test_ai_usage_analytics(self):
-        """Test AI usage tracking and limits"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test AI usage analytics
-            analytics_response = requests.get(f"{self.backend_url}/ai/usage/analytics", headers=headers, timeout=10)
-            
-            if analytics_response.status_code == 200:
-                analytics_data = analytics_response.json()
-                
-                # Test AI usage limits
-                limits_response = requests.get(f"{self.backend_url}/ai/usage/limits", headers=headers, timeout=10)
+    # 5. USER MANAGEMENT TESTS
+    @network_test("User Profile Management")
+    def test_user_profile_management(self):
+        """Test user profile retrieval and updates"""
+        headers = self.get_auth_headers()
+        
+        # Test GET profile
+        get_response = self.session.get(self.urls.profile, headers=headers, timeout=self.timeout)
+        
+        if get_response.status_code == 200:
+            profile_data = _json(get_response)
+            missing_fields = PROFILE_REQUIRED - profile_data.keys()
+            
+            if not missing_fields:
+                # Test PUT profile update
+                put_response = self.session.put(
+                    self.urls.profile,
+                    data=UPDATED_PROFILE_BODY,
+                    headers={**headers, **JSON_HEADERS},
+                    timeout=self.timeout
+                )
                 
-                if limits_response.status_code == 200:
-                    limits_data = limits_response.json()
-                    required_fields = ['user_tier', 'within_limits', 'current_usage']
-                    
-                    if any(field in limits_data for field in required_fields):
-                        self.log_result("AI Usage Analytics", True, 
-                                      f"AI usage tracking working - User tier: {limits_data.get('user_tier', 'unknown')}, Within limits: {limits_data.get('within_limits', 'unknown')}")
+                if put_response.status_code == 200:
+                    put_data = _json(put_response)
+                    if 'message' in put_data:
+                        self.log_result("User Profile Management", True, 
+                                      f"Profile GET/PUT working: {profile_data['name']} ({profile_data['email']})")
                         return True
                     else:
-                        self.log_result("AI Usage Analytics", False, "AI usage limits response missing required fields")
+                        self.log_result("User Profile Management", False, "Invalid PUT response format")
                         return False
                 else:
-                    self.log_result("AI Usage Analytics", False, f"AI usage limits failed: HTTP {limits_response.status_code}")
+                    self.log_result("User Profile Management", False, f"PUT failed: HTTP {put_response.status_code}")
                     return False
             else:
-                self.log_result("AI Usage Analytics", False, f"AI usage analytics failed: HTTP {analytics_response.status_code}")
+                self.log_result("User Profile Management", False, f"Missing profile fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("AI Usage Analytics", False, f"Request failed: {str(e)}")
+        elif get_response.status_code == 401 or get_response.status_code == 403:
+            self.log_result("User Profile Management", False, "Authentication required")
+            return False
+        else:
+            self.log_result("User Profile Management", False, f"GET failed: HTTP {get_response.status_code}")
             return False
 
-    # 9. Test Security Features
-    def test_security_features(self):
-        """Test rate limiting and input validation"""
-        try:
-            # Test rate limiting on health endpoint (10/minute limit)
-            rapid_requests = []
-            for i in range(12):  # Exceed the limit
-                response = requests.get(f"{self.backend_url}/health", timeout=5)
-                rapid_requests.append(response.status_code)
-                time.sleep(0.1)
-            
-            rate_limited = any(status == 429 for status in rapid_requests)
+    @network_test("User Settings Management")
+    def test_user_settings_management(self):
+        """Test user settings retrieval and updates"""
+        headers = self.get_auth_headers()
+        
+        # Test GET settings
+        get_response = self.session.get(self.urls.settings, headers=headers, timeout=self.timeout)
+        
+        if get_response.status_code == 200:
+            settings_data = _json(get_response)
+            
+            # Test PUT settings
+            put_response = self.session.put(
+                self.urls.settings,
+                data=UPDATED_SETTINGS_BODY,
+                headers={**headers, **JSON_HEADERS},
+                timeout=self.timeout
+            )
             
-            if rate_limited:
-                # Test input validation with oversized email
-                headers = self.get_auth_headers()
-                oversized_email = {
-                    "email_subject": "Test",
-                    "email_body": "A" * 60000,  # Exceeds 50KB limit
-                    "sender": "test@example.com",
-                    "recipient": self.test_user_data["email"]
-                }
-                
-                validation_response = requests.post(
-                    f"{self.backend_url}/scan/email",
-                    json=oversized_email,
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if validation_response.status_code in [400, 422]:
-                    self.log_result("Security Features", True, 
-                                  "Rate limiting and input validation working correctly")
+            if put_response.status_code == 200:
+                put_data = _json(put_response)
+                if 'message' in put_data:
+                    self.log_result("User Settings Management", True, "Settings GET/PUT operations working")
                     return True
                 else:
-                    self.log_result("Security Features", False, 
-                                  f"Input validation not working: HTTP {validation_response.status_code}")
+                    self.log_result("User Settings Management", False, "Invalid PUT response format")
                     return False
             else:
-                self.log_result("Security Features", False, "Rate limiting not working - no 429 responses")
+                self.log_result("User Settings Management", False, f"PUT failed: HTTP {put_response.status_code}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Security Features", False, f"Request failed: {str(e)}")
+        elif get_response.status_code == 401 or get_response.status_code == 403:
+            self.log_result("User Settings Management", False, "Authentication required")
+            return False
+        else:
+            self.log_result("User Settings Management", False, f"GET failed: HTTP {get_response.status_code}")
             return False
 
-    # 10. Test Error Handling
-    def test_error_handling(self):
-        """Test graceful fallbacks when AI modules are unavailable"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test with invalid data to trigger error handling
-            invalid_email = {
-                "email_subject": "",  # Empty subject
-                "email_body": "",     # Empty body
-                "sender": "invalid-email",  # Invalid email format
-                "recipient": self.test_user_data["email"]
-            }
-            
-            error_response = requests.post(
-                f"{self.backend_url}/scan/email",
-                json=invalid_email,
-                headers=headers,
-                timeout=10
-            )
-            
-            # Should handle gracefully (either process or return proper error)
-            if error_response.status_code in [200, 400, 422]:
-                # Test invalid URL
-                invalid_link = {
-                    "url": "not-a-valid-url",
-                    "context": "test"
-                }
-                
-                link_error_response = requests.post(
-                    f"{self.backend_url}/scan/link",
-                    json=invalid_link,
-=======
-            if login_response.status_code != 200:
-                self.log_result("Token Refresh", False, "Could not login to get refresh token")
-                return False
-            
-            refresh_token = login_response.json().get('refresh_token')
-            if not refresh_token:
-                self.log_result("Token Refresh", False, "No refresh token in login response")
-                return False
-            
-            # Test refresh endpoint
-            refresh_data = {"refresh_token": refresh_token}
-            response = requests.post(
-                f"{self.backend_url}/auth/refresh",
-                json=refresh_data,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'access_token' in data and 'refresh_token' in data:
-                    self.log_result("Token Refresh", True, "Token refresh successful")
-                    return True
-                else:
-                    self.log_result("Token Refresh", False, "Missing tokens in refresh response")
-                    return False
+    # 6. ERROR HANDLING TESTS
+    @network_test("Authentication Error Handling")
+    def test_authentication_error_handling(self):
+        """Test authentication error handling returns strings"""
+        # Test with invalid credentials
+        invalid_login_data = {
+            "email": "nonexistent@example.com",
+            "password": "wrongpassword"
+        }
+        
+        response = self.session.post(
+            self.urls.login,
+            json=invalid_login_data,
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 401:
+            data = _json(response)
+            # Check if error is returned as string, not object
+            if 'detail' in data and isinstance(data['detail'], str):
+                self.log_result("Authentication Error Handling", True, 
+                              f"Error returned as string: {data['detail']}")
+                return True
             else:
-                self.log_result("Token Refresh", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("Authentication Error Handling", False, 
+                              f"Error not returned as string: {type(data.get('detail'))}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Token Refresh", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Authentication Error Handling", False, 
+                          f"Expected 401, got HTTP {response.status_code}")
             return False
 
-    # 3. DASHBOARD API TESTS
-    def test_dashboard_stats(self):
-        """Test dashboard statistics API"""
-        try:
-            headers = self.get_auth_headers()
-            response = requests.get(f"{self.backend_url}/dashboard/stats", headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['phishing_caught', 'safe_emails', 'potential_phishing', 'total_scans', 'accuracy_rate']
-                
-                if all(field in data for field in required_fields):
-                    # Verify data types
-                    if (isinstance(data['phishing_caught'], int) and 
-                        isinstance(data['safe_emails'], int) and 
-                        isinstance(data['potential_phishing'], int) and
-                        isinstance(data['total_scans'], int) and
-                        isinstance(data['accuracy_rate'], (int, float))):
-                        self.log_result("Dashboard Stats", True, 
-                                      f"Stats: Phishing={data['phishing_caught']}, Safe={data['safe_emails']}, Total={data['total_scans']}")
-                        return True
-                    else:
-                        self.log_result("Dashboard Stats", False, "Invalid data types in response")
-                        return False
-                else:
-                    missing_fields = [f for f in required_fields if f not in data]
-                    self.log_result("Dashboard Stats", False, f"Missing fields: {missing_fields}")
-                    return False
-            elif response.status_code == 401 or response.status_code == 403:
-                self.log_result("Dashboard Stats", False, "Authentication required")
-                return False
+    @network_test("Validation Error Handling")
+    def test_validation_error_handling(self):
+        """Test validation error handling returns strings"""
+        # Test with invalid email format
+        invalid_registration_data = {
+            "name": "",  # Empty name
+            "email": "invalid-email-format",  # Invalid email
+            "password": "123",  # Too short password
+            "organization": ""  # Empty organization
+        }
+        
+        response = self.session.post(
+            self.urls.register,
+            json=invalid_registration_data,
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 422:
+            data = _json(response)
+            # Check if error is returned as string, not object
+            if 'detail' in data and isinstance(data['detail'], str):
+                self.log_result("Validation Error Handling", True, 
+                              f"Validation error returned as string: {data['detail'][:100]}...")
+                return True
             else:
-                self.log_result("Dashboard Stats", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("Validation Error Handling", False, 
+                              f"Validation error not returned as string: {type(data.get('detail'))}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Dashboard Stats", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Validation Error Handling", False, 
+                          f"Expected 422, got HTTP {response.status_code}")
             return False
 
-    def test_recent_emails_api(self):
-        """Test recent emails API"""
-        try:
-            headers = self.get_auth_headers()
-            response = requests.get(f"{self.backend_url}/dashboard/recent-emails", headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'emails' in data and isinstance(data['emails'], list):
-                    emails = data['emails']
-                    if len(emails) > 0:
-                        # Check first email structure
-                        first_email = emails[0]
-                        required_fields = ['id', 'subject', 'sender', 'time', 'status', 'risk_score']
-                        
-                        if all(field in first_email for field in required_fields):
-                            valid_statuses = ['safe', 'phishing', 'potential_phishing']
-                            statuses = [email.get('status') for email in emails]
-                            
-                            if all(status in valid_statuses for status in statuses):
-                                self.log_result("Recent Emails API", True, 
-                                              f"Retrieved {len(emails)} emails with valid structure")
-                                return True
-                            else:
-                                invalid_statuses = [s for s in statuses if s not in valid_statuses]
-                                self.log_result("Recent Emails API", False, f"Invalid status values: {invalid_statuses}")
-                                return False
-                        else:
-                            missing_fields = [f for f in required_fields if f not in first_email]
-                            self.log_result("Recent Emails API", False, f"Missing fields in email: {missing_fields}")
-                            return False
-                    else:
-                        self.log_result("Recent Emails API", True, "Empty email list (valid for new user)")
-                        return True
-                else:
-                    self.log_result("Recent Emails API", False, "Response missing 'emails' array")
-                    return False
-            elif response.status_code == 401 or response.status_code == 403:
-                self.log_result("Recent Emails API", False, "Authentication required")
+    @network_test("Cache Stats Access Control")
+    def test_cache_stats_access_control(self):
+        """Test cache stats access control for non-admin users"""
+        headers = self.get_auth_headers()
+        response = self.session.get(self.urls.ai_cache_stats, headers=headers, timeout=self.timeout)
+        
+        # Non-admin users should get 403, not 500
+        if response.status_code == 403:
+            data = _json(response)
+            if 'detail' in data and isinstance(data['detail'], str):
+                self.log_result("Cache Stats Access Control", True, 
+                              f"Proper 403 access control: {data['detail']}")
+                return True
+            else:
+                self.log_result("Cache Stats Access Control", False, 
+                              "403 response but error not returned as string")
                 return False
+        elif response.status_code == 500:
+            self.log_result("Cache Stats Access Control", False, 
+                          "Getting 500 error instead of 403 for non-admin user")
+            return False
+        else:
+            self.log_result("Cache Stats Access Control", False, 
+                          f"Unexpected status code: {response.status_code}")
+            return False
+
+    # 7. AI-ENHANCED SCANNING TESTS
+    @requires_online
+    @network_test("AI-Enhanced Email Scanning")
+    def test_ai_enhanced_email_scanning(self):
+        """Test AI-powered email scanning with fallback mechanism"""
+        headers = self.get_auth_headers()
+        
+        # Test 1: Legitimate email
+        legitimate_email = {
+            "email_subject": "Monthly Newsletter - Company Updates",
+            "email_body": "Dear Team, Here are this month's company updates and achievements. We've successfully completed several projects and are looking forward to the upcoming quarter. Best regards, HR Team",
+            "sender": "hr@company.com",
+            "recipient": self.test_user_data["email"]
+        }
+        
+        # Test 2: Phishing email
+        phishing_email = {
+            "email_subject": "URGENT: Account Suspended - Verify Now!",
+            "email_body": "Your account has been suspended due to suspicious activity. Click here immediately to verify: http://fake-bank-security.com/verify?urgent=true. Enter your login credentials to prevent permanent closure. This is time-sensitive!",
+            "sender": "security@fake-bank-security.com",
+            "recipient": self.test_user_data["email"]
+        }
+        
+        # Test 3: Urgency manipulation email
+        urgency_email = {
+            "email_subject": "Action Required: Account Will Be Closed in 24 Hours",
+            "email_body": "URGENT ACTION REQUIRED! Your account will be permanently closed in 24 hours unless you verify your identity immediately. Click here now: http://urgent-verification.tk/verify. Don't delay - act now!",
+            "sender": "urgent@verification-center.com",
+            "recipient": self.test_user_data["email"]
+        }
+        
+        # The three scans are independent, so their AI latencies overlap
+        response1, response2, response3 = self.post_concurrently(
+            self.urls.scan_email, [legitimate_email, phishing_email, urgency_email], headers, timeout=self.ai_timeout
+        )
+        
+        # Analyze results
+        if all(r.status_code == 200 for r in [response1, response2, response3]):
+            data1, data2, data3 = _json(response1), _json(response2), _json(response3)
+            
+            # Check if AI scanning is working properly
+            legitimate_safe = data1.get('risk_score', 100) <= 30 and data1.get('status') == 'safe'
+            phishing_detected = data2.get('risk_score', 0) >= 70 and data2.get('status') in ['phishing', 'potential_phishing']
+            urgency_detected = data3.get('risk_score', 0) >= 70 and data3.get('status') in ['phishing', 'potential_phishing']
+            
+            # Check for AI-powered features
+            has_explanations = all(len(d.get('explanation', '')) > 20 for d in [data1, data2, data3])
+            has_recommendations = all(len(d.get('recommendations', [])) > 0 for d in [data2, data3])
+            
+            if legitimate_safe and phishing_detected and urgency_detected and has_explanations:
+                self.log_result("AI-Enhanced Email Scanning", True, 
+                              f"AI scanning working - Legitimate: {data1['risk_score']:.1f}, Phishing: {data2['risk_score']:.1f}, Urgency: {data3['risk_score']:.1f}")
+                return True
             else:
-                self.log_result("Recent Emails API", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("AI-Enhanced Email Scanning", False, 
+                              f"AI detection issues - Legitimate: {data1['risk_score']:.1f}, Phishing: {data2['risk_score']:.1f}, Urgency: {data3['risk_score']:.1f}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Recent Emails API", False, f"Request failed: {str(e)}")
+        else:
+            status_codes = [r.status_code for r in [response1, response2, response3]]
+            self.log_result("AI-Enhanced Email Scanning", False, 
+                          f"HTTP errors: {status_codes}")
             return False
 
-    # 4. AI INTEGRATION TESTS
-    def test_ai_email_scanning(self):
-        """Test AI-powered email scanning"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test with phishing email
-            phishing_email_data = {
-                "email_subject": "URGENT: Account Security Alert - Immediate Action Required",
-                "email_body": "Dear Customer, Your account has been compromised and will be suspended in 24 hours. Click here to verify your identity: http://secure-bank-verification.com/verify?token=urgent123. Please provide your login credentials immediately to prevent account closure. This is urgent and requires immediate action.",
-                "sender": "security@secure-bank-verification.com",
-                "recipient": self.test_user_data["email"]
-            }
-            
-            response = requests.post(
-                f"{self.backend_url}/scan/email",
-                json=phishing_email_data,
-                headers=headers,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['id', 'status', 'risk_score', 'explanation', 'threat_sources', 'detected_threats', 'recommendations']
+    @requires_online
+    @network_test("AI-Enhanced Link Scanning")
+    def test_ai_enhanced_link_scanning(self):
+        """Test AI-powered link scanning with threat detection"""
+        headers = self.get_auth_headers()
+        
+        # Test 1: Legitimate URL
+        legitimate_link = {
+            "url": "https://www.google.com",
+            "context": "Search engine link"
+        }
+        
+        # Test 2: Malicious URL
+        malicious_link = {
+            "url": "http://phishing-site-example.tk/login?redirect=malicious.com",
+            "context": "Suspicious login page found in email"
+        }
+        
+        # Test 3: Shortened URLs
+        shortened_links = [
+            {"url": "http://bit.ly/suspicious123", "context": "Shortened URL in email"},
+            {"url": "http://tinyurl.com/malicious456", "context": "Tiny URL redirect"},
+            {"url": "http://t.co/phishing789", "context": "Twitter shortened link"}
+        ]
+        
+        # All five scans are independent, so their AI latencies overlap
+        response1, response2, *shortened_responses = self.post_concurrently(
+            self.urls.scan_link, [legitimate_link, malicious_link] + shortened_links, headers, timeout=self.ai_timeout
+        )
+        
+        # Analyze results
+        if response1.status_code == 200 and response2.status_code == 200:
+            data1, data2 = _json(response1), _json(response2)
+            
+            # Check AI link analysis
+            legitimate_safe = data1.get('risk_score', 100) <= 30 and data1.get('status') == 'safe'
+            malicious_detected = data2.get('risk_score', 0) >= 70 and data2.get('status') in ['phishing', 'potential_phishing']
+            
+            # Check shortened URL detection
+            shortened_detected = 0
+            for resp in shortened_responses:
+                if resp.status_code == 200:
+                    data = _json(resp)
+                    if data.get('is_shortened', False):
+                        shortened_detected += 1
                 
-                if all(field in data for field in required_fields):
-                    risk_score = data.get('risk_score', 0)
-                    status = data.get('status')
-                    explanation = data.get('explanation', '')
-                    
-                    # Verify AI scanning is working
-                    if (isinstance(risk_score, (int, float)) and 
-                        status in ['safe', 'potential_phishing', 'phishing'] and
-                        len(explanation) > 20):
-                        self.log_result("AI Email Scanning", True, 
-                                      f"AI scan completed: Risk={risk_score:.1f}, Status={status}")
-                        return True
-                    else:
-                        self.log_result("AI Email Scanning", False, 
-                                      f"AI scanning not working properly: Risk={risk_score}, Status={status}")
-                        return False
-                else:
-                    missing_fields = [f for f in required_fields if f not in data]
-                    self.log_result("AI Email Scanning", False, f"Missing response fields: {missing_fields}")
-                    return False
-            elif response.status_code == 401 or response.status_code == 403:
-                self.log_result("AI Email Scanning", False, "Authentication required")
-                return False
+            if legitimate_safe and malicious_detected and shortened_detected >= 2:
+                self.log_result("AI-Enhanced Link Scanning", True, 
+                              f"AI link scanning working - Legitimate: {data1['risk_score']:.1f}, Malicious: {data2['risk_score']:.1f}, Shortened detected: {shortened_detected}/3")
+                return True
             else:
-                self.log_result("AI Email Scanning", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("AI-Enhanced Link Scanning", False, 
+                              f"AI link detection issues - Legitimate: {data1['risk_score']:.1f}, Malicious: {data2['risk_score']:.1f}, Shortened: {shortened_detected}/3")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("AI Email Scanning", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("AI-Enhanced Link Scanning", False, 
+                          f"HTTP errors: {response1.status_code}, {response2.status_code}")
             return False
 
-    def test_ai_link_scanning(self):
-        """Test AI-powered link scanning"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test with suspicious link
-            suspicious_link_data = {
-                "url": "http://secure-bank-verification.com/verify-account?token=suspicious123&redirect=http://malicious-site.tk",
-                "context": "Click here to verify your account immediately to prevent suspension"
-            }
-            
-            response = requests.post(
-                f"{self.backend_url}/scan/link",
-                json=suspicious_link_data,
-                headers=headers,
-                timeout=15
-            )
+    # 8. DASHBOARD, REAL-TIME & ADMIN TESTS
+    @network_test("Dashboard Endpoints")
+    def test_dashboard_endpoints(self):
+        """Test user dashboard statistics and recent emails"""
+        headers = self.get_auth_headers()
+        
+        # Test dashboard stats
+        stats_response = self.session.get(self.urls.stats, headers=headers, timeout=self.timeout)
+        
+        if stats_response.status_code == 200:
+            stats_data = _json(stats_response)
+            missing_fields = STATS_REQUIRED - stats_data.keys()
             
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['url', 'status', 'risk_score', 'explanation', 'threat_categories', 'redirect_chain', 'is_shortened']
+            if not missing_fields:
+                # Test recent emails
+                emails_response = self.session.get(self.urls.recent_emails, headers=headers, timeout=self.timeout)
                 
-                if all(field in data for field in required_fields):
-                    risk_score = data.get('risk_score', 0)
-                    status = data.get('status')
-                    explanation = data.get('explanation', '')
+                if emails_response.status_code == 200:
+                    emails_data = _json(emails_response)
                     
-                    # Verify AI link scanning is working
-                    if (isinstance(risk_score, (int, float)) and 
-                        status in ['safe', 'potential_phishing', 'phishing'] and
-                        len(explanation) > 20):
-                        self.log_result("AI Link Scanning", True, 
-                                      f"AI link scan completed: Risk={risk_score:.1f}, Status={status}")
+                    if 'emails' in emails_data and isinstance(emails_data['emails'], list):
+                        self.log_result("Dashboard Endpoints", True, 
+                                      f"Dashboard working - Stats: {stats_data['total_scans']} scans, {stats_data['accuracy_rate']}% accuracy, {len(emails_data['emails'])} recent emails")
                         return True
                     else:
-                        self.log_result("AI Link Scanning", False, 
-                                      f"AI link scanning not working properly: Risk={risk_score}, Status={status}")
+                        self.log_result("Dashboard Endpoints", False, "Recent emails format invalid")
                         return False
                 else:
-                    missing_fields = [f for f in required_fields if f not in data]
-                    self.log_result("AI Link Scanning", False, f"Missing response fields: {missing_fields}")
+                    self.log_result("Dashboard Endpoints", False, f"Recent emails failed: HTTP {emails_response.status_code}")
                     return False
-            elif response.status_code == 401 or response.status_code == 403:
-                self.log_result("AI Link Scanning", False, "Authentication required")
-                return False
             else:
-                self.log_result("AI Link Scanning", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_result("Dashboard Endpoints", False, f"Missing stats fields: {sorted(missing_fields)}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("AI Link Scanning", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Dashboard Endpoints", False, f"Dashboard stats failed: HTTP {stats_response.status_code}")
             return False
 
-    # 5. USER MANAGEMENT TESTS
-    def test_user_profile_management(self):
-        """Test user profile retrieval and updates"""
+    def test_websocket_health(self):
+        """Test WebSocket connection for real-time features"""
         try:
-            headers = self.get_auth_headers()
+            # User ID is loaded once by setup_shared_state
+            user_id = self.test_user_id
+            if not user_id:
+                self.log_result("WebSocket Health", False, "No user ID loaded from profile")
+                return False
+            
+            # Test WebSocket connection
+            ws_url = self.backend_url.replace('http', 'ws').replace('/api', f'/api/ws/{user_id}')
+            
+            connection_successful = False
+            connection_error = None
+            
+            def on_open(ws):
+                nonlocal connection_successful
+                connection_successful = True
+                # Send a ping message
+                ws.send(json.dumps({"type": "ping"}))
+            
+            def on_message(ws, message):
+                try:
+                    data = json.loads(message)
+                    if data.get("type") == "pong":
+                        ws.close()
+                except:
+                    pass
             
-            # Test GET profile
-            get_response = requests.get(f"{self.backend_url}/user/profile", headers=headers, timeout=10)
+            def on_error(ws, error):
+                nonlocal connection_error
+                connection_error = str(error)
             
-            if get_response.status_code == 200:
-                profile_data = get_response.json()
-                required_fields = ['id', 'name', 'email', 'organization', 'is_active', 'role']
+            try:
+                ws = websocket.WebSocketApp(ws_url,
+                                          on_open=on_open,
+                                          on_message=on_message,
+                                          on_error=on_error)
                 
-                if all(field in profile_data for field in required_fields):
-                    # Test PUT profile update
-                    update_data = {
-                        "name": "Sarah Johnson Updated",
-                        "organization": "CyberSec Testing Corp Updated"
-                    }
-                    
-                    put_response = requests.put(
-                        f"{self.backend_url}/user/profile",
-                        json=update_data,
-                        headers=headers,
-                        timeout=10
-                    )
-                    
-                    if put_response.status_code == 200:
-                        put_data = put_response.json()
-                        if 'message' in put_data:
-                            self.log_result("User Profile Management", True, 
-                                          f"Profile GET/PUT working: {profile_data['name']} ({profile_data['email']})")
-                            return True
-                        else:
-                            self.log_result("User Profile Management", False, "Invalid PUT response format")
-                            return False
-                    else:
-                        self.log_result("User Profile Management", False, f"PUT failed: HTTP {put_response.status_code}")
-                        return False
+                # Run WebSocket in a separate thread with timeout
+                ws_thread = threading.Thread(target=ws.run_forever)
+                ws_thread.daemon = True
+                ws_thread.start()
+                
+                # Wait for connection
+                time.sleep(2)
+                
+                if connection_successful:
+                    self.log_result("WebSocket Health", True, "WebSocket connection and ping/pong working")
+                    return True
                 else:
-                    missing_fields = [f for f in required_fields if f not in profile_data]
-                    self.log_result("User Profile Management", False, f"Missing profile fields: {missing_fields}")
+                    self.log_result("WebSocket Health", False, f"WebSocket connection failed: {connection_error}")
                     return False
-            elif get_response.status_code == 401 or get_response.status_code == 403:
-                self.log_result("User Profile Management", False, "Authentication required")
-                return False
-            else:
-                self.log_result("User Profile Management", False, f"GET failed: HTTP {get_response.status_code}")
+                    
+            except Exception as e:
+                self.log_result("WebSocket Health", False, f"WebSocket test failed: {str(e)}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
-            self.log_result("User Profile Management", False, f"Request failed: {str(e)}")
+        except Exception as e:
+            self.log_result("WebSocket Health", False, f"WebSocket setup failed: {str(e)}")
             return False
 
-    def test_user_settings_management(self):
-        """Test user settings retrieval and updates"""
-        try:
-            headers = self.get_auth_headers()
-            
-            # Test GET settings
-            get_response = requests.get(f"{self.backend_url}/user/settings", headers=headers, timeout=10)
+    @network_test("Admin Panel")
+    def test_admin_panel(self):
+        """Test admin dashboard endpoints with proper role-based access"""
+        # First test with regular user (should be denied)
+        headers = self.get_auth_headers()
+        
+        admin_stats_response = self.session.get(self.urls.admin_stats, headers=headers, timeout=self.timeout)
+        
+        if admin_stats_response.status_code == 403:
+            # Test admin endpoints structure (even though we can't access them)
+            admin_endpoints = [
+                "/admin/dashboard/stats",
+                "/admin/users",
+                "/admin/threats",
+                "/admin/system/monitoring",
+                "/admin/audit/log"
+            ]
             
-            if get_response.status_code == 200:
-                settings_data = get_response.json()
-                
-                # Test PUT settings
-                updated_settings = {
-                    "email_notifications": True,
-                    "scan_notifications": True,
-                    "weekly_reports": False,
-                    "language": "en",
-                    "timezone": "UTC",
-                    "scan_sensitivity": "medium",
-                    "auto_quarantine": False,
-                    "share_threat_intelligence": True
-                }
-                
-                put_response = requests.put(
-                    f"{self.backend_url}/user/settings",
-                    json=updated_settings,
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
-                    headers=headers,
-                    timeout=10
-                )
+            access_denied_count = 0
+            for endpoint in admin_endpoints:
+                response = self.session.get(f"{self.backend_url}{endpoint}", headers=headers, timeout=self.timeout)
+                if response.status_code == 403:
+                    access_denied_count += 1
                 
-<<<<<<< HEAD
-                if link_error_response.status_code in [200, 400, 422]:
-                    # Test unauthenticated request
-                    unauth_response = requests.get(f"{self.backend_url}/user/profile", timeout=10)
-                    
-                    if unauth_response.status_code in [401, 403]:
-                        self.log_result("Error Handling", True, 
-                                      "Error handling working - Invalid data handled gracefully, authentication enforced")
-                        return True
-                    else:
-                        self.log_result("Error Handling", False, 
-                                      f"Authentication not enforced: HTTP {unauth_response.status_code}")
-                        return False
-                else:
-                    self.log_result("Error Handling", False, 
-                                  f"Link error handling failed: HTTP {link_error_response.status_code}")
-                    return False
+            if access_denied_count == len(admin_endpoints):
+                self.log_result("Admin Panel", True, 
+                              f"Admin panel properly protected - All {len(admin_endpoints)} endpoints deny regular user access")
+                return True
             else:
-                self.log_result("Error Handling", False, 
-                              f"Email error handling failed: HTTP {error_response.status_code}")
+                self.log_result("Admin Panel", False, 
+                              f"Admin panel security issue - Only {access_denied_count}/{len(admin_endpoints)} endpoints properly protected")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Error Handling", False, f"Request failed: {str(e)}")
-=======
-                if put_response.status_code == 200:
-                    put_data = put_response.json()
-                    if 'message' in put_data:
-                        self.log_result("User Settings Management", True, "Settings GET/PUT operations working")
-                        return True
-                    else:
-                        self.log_result("User Settings Management", False, "Invalid PUT response format")
-                        return False
+        else:
+            self.log_result("Admin Panel", False, 
+                          f"Admin panel not properly protected - Regular user got HTTP {admin_stats_response.status_code}")
+            return False
+
+    @network_test("AI Usage Analytics")
+    def test_ai_usage_analytics(self):
+        """Test AI usage tracking and limits"""
+        headers = self.get_auth_headers()
+        
+        # Test AI usage analytics
+        analytics_response = self.session.get(self.urls.ai_usage_analytics, headers=headers, timeout=self.timeout)
+        
+        if analytics_response.status_code == 200:
+            analytics_data = _json(analytics_response)
+            
+            # Test AI usage limits
+            limits_response = self.session.get(self.urls.ai_usage_limits, headers=headers, timeout=self.timeout)
+            
+            if limits_response.status_code == 200:
+                limits_data = _json(limits_response)
+                if not USAGE_LIMIT_FIELDS.isdisjoint(limits_data):
+                    self.log_result("AI Usage Analytics", True, 
+                                  f"AI usage tracking working - User tier: {limits_data.get('user_tier', 'unknown')}, Within limits: {limits_data.get('within_limits', 'unknown')}")
+                    return True
                 else:
-                    self.log_result("User Settings Management", False, f"PUT failed: HTTP {put_response.status_code}")
+                    self.log_result("AI Usage Analytics", False, "AI usage limits response missing required fields")
                     return False
-            elif get_response.status_code == 401 or get_response.status_code == 403:
-                self.log_result("User Settings Management", False, "Authentication required")
-                return False
             else:
-                self.log_result("User Settings Management", False, f"GET failed: HTTP {get_response.status_code}")
+                self.log_result("AI Usage Analytics", False, f"AI usage limits failed: HTTP {limits_response.status_code}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("User Settings Management", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("AI Usage Analytics", False, f"AI usage analytics failed: HTTP {analytics_response.status_code}")
             return False
 
-    # 6. ERROR HANDLING TESTS
-    def test_authentication_error_handling(self):
-        """Test authentication error handling returns strings"""
-        try:
-            # Test with invalid credentials
-            invalid_login_data = {
-                "email": "nonexistent@example.com",
-                "password": "wrongpassword"
+    # 9. SECURITY & RESILIENCE TESTS
+    @needs_isolation
+    @network_test("Security Features")
+    def test_security_features(self):
+        """Test rate limiting and input validation"""
+        # Test rate limiting on health endpoint (10/minute limit)
+        rapid_requests = []
+        for i in range(12):  # Exceed the limit
+            response = self.session.get(self.urls.health, timeout=self.timeout)
+            rapid_requests.append(response.status_code)
+            time.sleep(0.1)
+            
+        rate_limited = any(status == 429 for status in rapid_requests)
+        
+        if rate_limited:
+            # Test input validation with oversized email
+            headers = self.get_auth_headers()
+            oversized_email = {
+                "email_subject": "Test",
+                "email_body": "A" * 60000,  # Exceeds 50KB limit
+                "sender": "test@example.com",
+                "recipient": self.test_user_data["email"]
             }
             
-            response = requests.post(
-                f"{self.backend_url}/auth/login",
-                json=invalid_login_data,
-                timeout=10
+            validation_response = self.session.post(
+                self.urls.scan_email,
+                json=oversized_email,
+                headers=headers,
+                timeout=self.timeout
             )
             
-            if response.status_code == 401:
-                data = response.json()
-                # Check if error is returned as string, not object
-                if 'detail' in data and isinstance(data['detail'], str):
-                    self.log_result("Authentication Error Handling", True, 
-                                  f"Error returned as string: {data['detail']}")
-                    return True
-                else:
-                    self.log_result("Authentication Error Handling", False, 
-                                  f"Error not returned as string: {type(data.get('detail'))}")
-                    return False
+            if validation_response.status_code in [400, 422]:
+                self.log_result("Security Features", True, 
+                              "Rate limiting and input validation working correctly")
+                return True
             else:
-                self.log_result("Authentication Error Handling", False, 
-                              f"Expected 401, got HTTP {response.status_code}")
+                self.log_result("Security Features", False, 
+                              f"Input validation not working: HTTP {validation_response.status_code}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Authentication Error Handling", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Security Features", False, "Rate limiting not working - no 429 responses")
             return False
 
-    def test_validation_error_handling(self):
-        """Test validation error handling returns strings"""
-        try:
-            # Test with invalid email format
-            invalid_registration_data = {
-                "name": "",  # Empty name
-                "email": "invalid-email-format",  # Invalid email
-                "password": "123",  # Too short password
-                "organization": ""  # Empty organization
+    @network_test("Error Handling")
+    def test_error_handling(self):
+        """Test graceful fallbacks when AI modules are unavailable"""
+        headers = self.get_auth_headers()
+        
+        # Test with invalid data to trigger error handling
+        invalid_email = {
+            "email_subject": "",  # Empty subject
+            "email_body": "",     # Empty body
+            "sender": "invalid-email",  # Invalid email format
+            "recipient": self.test_user_data["email"]
+        }
+        
+        error_response = self.session.post(
+            self.urls.scan_email,
+            json=invalid_email,
+            headers=headers,
+            timeout=self.timeout
+        )
+        
+        # Should handle gracefully (either process or return proper error)
+        if error_response.status_code in [200, 400, 422]:
+            # Test invalid URL
+            invalid_link = {
+                "url": "not-a-valid-url",
+                "context": "test"
             }
             
-            response = requests.post(
-                f"{self.backend_url}/auth/register",
-                json=invalid_registration_data,
-                timeout=10
+            link_error_response = self.session.post(
+                self.urls.scan_link,
+                json=invalid_link,
+                headers=headers,
+                timeout=self.timeout
             )
             
-            if response.status_code == 422:
-                data = response.json()
-                # Check if error is returned as string, not object
-                if 'detail' in data and isinstance(data['detail'], str):
-                    self.log_result("Validation Error Handling", True, 
-                                  f"Validation error returned as string: {data['detail'][:100]}...")
+            if link_error_response.status_code in [200, 400, 422]:
+                # Test unauthenticated request
+                unauth_response = self.session.get(self.urls.profile,
+                                                   headers={"Authorization": None}, timeout=self.timeout)
+                    
+                if unauth_response.status_code in [401, 403]:
+                    self.log_result("Error Handling", True, 
+                                  "Error handling working - Invalid data handled gracefully, authentication enforced")
                     return True
                 else:
-                    self.log_result("Validation Error Handling", False, 
-                                  f"Validation error not returned as string: {type(data.get('detail'))}")
+                    self.log_result("Error Handling", False, 
+                                  f"Authentication not enforced: HTTP {unauth_response.status_code}")
                     return False
             else:
-                self.log_result("Validation Error Handling", False, 
-                              f"Expected 422, got HTTP {response.status_code}")
+                self.log_result("Error Handling", False, 
+                              f"Link error handling failed: HTTP {link_error_response.status_code}")
                 return False
-                
-        except requests.exceptions.RequestException as e:
-            self.log_result("Validation Error Handling", False, f"Request failed: {str(e)}")
+        else:
+            self.log_result("Error Handling", False, 
+                          f"Email error handling failed: HTTP {error_response.status_code}")
             return False
 
-    def test_cache_stats_access_control(self):
-        """Test cache stats access control for non-admin users"""
+    def serialize_results(self):
+        """Convert results to dicts, formatting ISO timestamps only now that they are needed"""
+        return [{
+            'test': r.test,
+            'success': r.success,
+            'details': r.details,
+            'timestamp': datetime.fromtimestamp(self.t0 + r.ts_ns / 1e9).isoformat()
+        } for r in self.results]
+
+    def shard_path(self, path):
+        """Give each shard its own report file so parallel processes don't overwrite each other"""
+        index, count = self.shard
+        if count == 1:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.shard{index}{ext}"
+
+    def save_results(self, passed, total):
+        """Save JSON and JUnit XML reports so CI can read results without re-running"""
+        results_path, junit_path = self.shard_path(RESULTS_PATH), self.shard_path(JUNIT_PATH)
         try:
-            headers = self.get_auth_headers()
-            response = requests.get(f"{self.backend_url}/ai/cache/stats", headers=headers, timeout=10)
-            
-            # Non-admin users should get 403, not 500
-            if response.status_code == 403:
-                data = response.json()
-                if 'detail' in data and isinstance(data['detail'], str):
-                    self.log_result("Cache Stats Access Control", True, 
-                                  f"Proper 403 access control: {data['detail']}")
-                    return True
-                else:
-                    self.log_result("Cache Stats Access Control", False, 
-                                  "403 response but error not returned as string")
-                    return False
-            elif response.status_code == 500:
-                self.log_result("Cache Stats Access Control", False, 
-                              "Getting 500 error instead of 403 for non-admin user")
-                return False
-            else:
-                self.log_result("Cache Stats Access Control", False, 
-                              f"Unexpected status code: {response.status_code}")
-                return False
-                
+            with open(results_path, 'w') as f:
+                json.dump({
+                    'timestamp': datetime.now().isoformat(),
+                    'backend_url': self.backend_url,
+                    'passed': passed,
+                    'total': total,
+                    'results': self.serialize_results(),
+                    'durations': self.durations
+                }, f, indent=2)
+            
+            suite = ET.Element('testsuite', name='comprehensive_backend', tests=str(len(self.results)),
+                               failures=str(sum(1 for r in self.results if not r.success)),
+                               time=f"{sum(r.duration_ns for r in self.results) / 1e9:.3f}")
+            for result in self.results:
+                case = ET.SubElement(suite, 'testcase', classname='backend', name=result.test,
+                                     time=f"{result.duration_ns / 1e9:.3f}")
+                if not result.success:
+                    ET.SubElement(case, 'failure', message=str(result.details))
+            ET.ElementTree(suite).write(junit_path, encoding='utf-8', xml_declaration=True)
+            
+            print(f"📄 Test results saved to {results_path} and {junit_path}")
+        except Exception as e:
+            print(f"❌ Error saving results: {e}")
+
+    def run_test(self, test_func):
+        """Run a single test, record its duration and return whether it passed"""
+        if self.progress is not None:
+            self.progress.set_postfix_str(test_func.__name__)
+        started = time.perf_counter()
+        self._tls.started_ns = time.monotonic_ns()
+        passed = False
+        try:
+            passed = bool(test_func())
+        except Exception as e:
+            self.log_result(test_func.__name__, False, f"Test execution error: {str(e)}")
+        with self._lock:
+            self.durations[test_func.__name__] = time.perf_counter() - started
+        if self.progress is not None:
+            self.progress.update()
+        return passed
+
+    def run_batch(self, tests, parallel=True):
+        """Run one batch of tests, concurrently unless told otherwise, and return how many passed"""
+        if not parallel or len(tests) == 1:
+            return sum(self.run_test(test_func) for test_func in tests)
+        # Tests are network-bound, so threads overlap their round-trips despite the GIL
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(tests))) as executor:
+            return sum(executor.map(self.run_test, tests))
+
+    def run_category(self, category_name, tests):
+        """Run one category of tests in batches and return how many passed"""
+        if self.progress is not None:
+            self.progress.set_description(category_name)
+        else:
+            self.emit(f"\n📋 {category_name}")
+            self.emit("-" * 50)
+        
+        parallel = category_name not in ORDERED_CATEGORIES
+        if parallel:
+            # Longest-first; tests without a recorded duration go to the front
+            tests = sorted(tests, key=lambda t: -self.durations.get(t.__name__, 1e9))
+        
+        category_passed = 0
+        for start in range(0, len(tests), BATCH_SIZE):
+            category_passed += self.run_batch(tests[start:start + BATCH_SIZE], parallel)
+            # Release response bodies from the finished batch before the next one
+            gc.collect()
+        
+        self.emit(f"   Category Result: {category_passed}/{len(tests)} tests passed")
+        return category_passed
+
+    def collect_background(self, futures):
+        """Wait for the background AI scans and return how many passed"""
+        passed = sum(future.result() for future in futures)
+        self.emit(f"\n📋 AI SCANNING (background): {passed}/{len(futures)} tests passed")
+        return passed
+
+    def restore_cached_user(self):
+        """Reuse the user and tokens cached by an earlier run if the backend still accepts them"""
+        row = self.cache.execute("SELECT payload FROM fixtures WHERE key = ?",
+                                 (f"user:{self.backend_url}",)).fetchone()
+        if row is None:
+            return False
+        cached = json.loads(row[0])
+        try:
+            response = self.session.get(self.urls.profile,
+                                        headers={"Authorization": f"Bearer {cached['access_token']}"},
+                                        timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return False
+        if response.status_code != 200:
+            return False
+        self.test_user_data = cached['user']
+        # The body built in __init__ addressed the freshly generated user, not this one
+        self.phishing_email_body = self._encode_phishing_email_body()
+        self.set_auth_token(cached['access_token'])
+        self.refresh_token = cached['refresh_token']
+        return True
+
+    def store_cached_user(self):
+        """Persist the logged-in test user so the next run can skip registration and login"""
+        payload = json.dumps({
+            'user': self.test_user_data,
+            'access_token': self.auth_token,
+            'refresh_token': self.refresh_token
+        })
+        with self._lock, self.cache:
+            self.cache.execute("INSERT OR REPLACE INTO fixtures (key, payload, updated) VALUES (?, ?, ?)",
+                               (f"user:{self.backend_url}", payload, time.time()))
+
+    def setup_shared_state(self):
+        """Fetch state shared by several tests once, after the test user has logged in"""
+        if not self.auth_token:
+            return
+        try:
+            response = self.session.get(self.urls.profile, headers=self.get_auth_headers(), timeout=self.timeout)
+            if response.status_code == 200:
+                self.test_user_id = _json(response).get('id')
         except requests.exceptions.RequestException as e:
-            self.log_result("Cache Stats Access Control", False, f"Request failed: {str(e)}")
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+            self.emit(f"⚠️  Could not load shared test state: {e}")
+
+    def teardown_shared_state(self):
+        """Drop shared credentials so nothing leaks into a later run in this process"""
+        self.test_user_id = None
+
+    def probe_backend(self):
+        """Return whether /health answers quickly enough to be worth running the suite"""
+        try:
+            return self.session.get(self.urls.health, timeout=(1, 2)).ok
+        except requests.exceptions.RequestException:
             return False
 
     def run_comprehensive_tests(self):
@@ -1217,62 +1405,11 @@ class ComprehensiveBackendTester:
         print("=" * 80)
         print("🚀 AMAN CYBERSECURITY PLATFORM - COMPREHENSIVE BACKEND TESTING")
         print("=" * 80)
-<<<<<<< HEAD
-        
-        # Critical backend functionality tests
-        tests = [
-            ("Database Connection", self.test_database_connection),
-            ("Authentication System", self.test_authentication_system),
-            ("AI-Enhanced Email Scanning", self.test_ai_enhanced_email_scanning),
-            ("AI-Enhanced Link Scanning", self.test_ai_enhanced_link_scanning),
-            ("Dashboard Endpoints", self.test_dashboard_endpoints),
-            ("WebSocket Health", self.test_websocket_health),
-            ("Admin Panel", self.test_admin_panel),
-            ("AI Usage Analytics", self.test_ai_usage_analytics),
-            ("Security Features", self.test_security_features),
-            ("Error Handling", self.test_error_handling)
-        ]
-        
-        passed = 0
-        total = len(tests)
-        
-        for test_name, test_func in tests:
-            print(f"\n🔍 Testing: {test_name}")
-            try:
-                if test_func():
-                    passed += 1
-            except Exception as e:
-                self.log_result(test_name, False, f"Test execution failed: {str(e)}")
-        
-        # Print summary
-        print("\n" + "=" * 80)
-        print("📊 COMPREHENSIVE BACKEND TEST RESULTS")
-        print("=" * 80)
-        
-        success_rate = (passed / total) * 100
-        print(f"✅ Passed: {passed}/{total} ({success_rate:.1f}%)")
-        print(f"❌ Failed: {total - passed}/{total}")
-        
-        if success_rate >= 80:
-            print("🎉 BACKEND STATUS: EXCELLENT - Production Ready")
-        elif success_rate >= 60:
-            print("⚠️  BACKEND STATUS: GOOD - Minor Issues")
-        else:
-            print("🚨 BACKEND STATUS: NEEDS ATTENTION - Critical Issues")
-        
-        # Print detailed results
-        print("\n📋 DETAILED TEST RESULTS:")
-        for result in self.results:
-            status = "✅" if result['success'] else "❌"
-            print(f"{status} {result['test']}: {result['details']}")
-        
-        return success_rate >= 80
-=======
         print("Testing core functionality after fixing React rendering error and backend issues")
         print()
         
-        # Core functionality tests as requested in review
-        core_tests = [
+        # Prerequisites run first: they log in the user every later test shares
+        prerequisite_tests = [
             # 1. Health Check & Database
             ("HEALTH CHECK & DATABASE", [
                 self.test_basic_health_check,
@@ -1285,7 +1422,10 @@ class ComprehensiveBackendTester:
                 self.test_user_login,
                 self.test_token_refresh,
             ]),
-            
+        ]
+        
+        # Core functionality tests as requested in review
+        core_tests = [
             # 3. Dashboard APIs
             ("DASHBOARD APIs", [
                 self.test_dashboard_stats,
@@ -1310,45 +1450,130 @@ class ComprehensiveBackendTester:
                 self.test_validation_error_handling,
                 self.test_cache_stats_access_control,
             ]),
+            
+            # 7. AI-Enhanced Scanning
+            ("AI-ENHANCED SCANNING", [
+                self.test_ai_enhanced_email_scanning,
+                self.test_ai_enhanced_link_scanning,
+                self.test_ai_usage_analytics,
+            ]),
+            
+            # 8. Dashboard, Real-time & Admin
+            ("DASHBOARD, REAL-TIME & ADMIN", [
+                self.test_dashboard_endpoints,
+                self.test_websocket_health,
+                self.test_admin_panel,
+            ]),
+            
+            # 9. Security & Resilience
+            ("SECURITY & RESILIENCE", [
+                self.test_error_handling,
+                self.test_security_features,
+            ]),
         ]
         
+        index, count = self.shard
+        if count > 1:
+            # Every shard logs in on its own; the core categories are split round-robin between them
+            core_tests = core_tests[index::count]
+            print(f"🧩 Shard {index + 1}/{count}: {', '.join(name for name, _ in core_tests) or 'no categories'}")
+        
+        # Tests that disturb shared state run on their own, after everything else
+        isolated_tests = [t for _, tests in core_tests for t in tests if getattr(t, '_needs_isolation', False)]
+        core_tests = [(name, [t for t in tests if t not in isolated_tests]) for name, tests in core_tests]
+        
+        if not self.online:
+            # AI scans call external LLM providers; keep the default run to fast local checks
+            online_count = sum(1 for _, tests in core_tests for t in tests if getattr(t, '_requires_online', False))
+            core_tests = [(name, [t for t in tests if not getattr(t, '_requires_online', False)])
+                          for name, tests in core_tests]
+            print(f"⏭️  Skipping {online_count} AI provider tests (pass --online to run them)")
+        
+        # AI scans are the slowest tests, so they start in the background as soon as the user is
+        # logged in and their LLM latency overlaps the fast endpoint tests
+        background_tests = [t for _, tests in core_tests for t in tests if getattr(t, '_requires_online', False)]
+        core_tests = [(name, [t for t in tests if t not in background_tests]) for name, tests in core_tests]
+        core_tests = [(name, tests) for name, tests in core_tests if tests]
+        if isolated_tests:
+            core_tests.append(("ISOLATED", isolated_tests))
+        all_tests = [t for _, tests in prerequisite_tests + core_tests for t in tests] + background_tests
+        
+        # One cheap probe instead of every test waiting out its own timeout
+        if not self.probe_backend():
+            print(f"❌ Backend unreachable at {self.backend_url} - skipping all tests")
+            for test_func in all_tests:
+                self.log_result(test_func.__name__, False, "skipped: backend unreachable")
+            self._log_q.join()
+            self.save_results(0, len(self.results))
+            return False
+        
+        if self.restore_cached_user():
+            # Cached tokens still work, so registering and logging in again would only repeat work
+            cached_skips = {self.test_user_registration, self.test_user_login}
+            prerequisite_tests = [(name, [t for t in tests if t not in cached_skips])
+                                  for name, tests in prerequisite_tests]
+            all_tests = [t for t in all_tests if t not in cached_skips]
+            print(f"♻️  Reusing cached test user {self.test_user_data['email']} - skipping registration and login")
+        
         total_passed = 0
         total_tests = 0
         
-        for category_name, tests in core_tests:
-            print(f"\n📋 {category_name}")
-            print("-" * 50)
+        if TQDM_AVAILABLE:
+            # The bar redraws on a timer and shows an ETA, replacing per-category banners
+            self.progress = tqdm(total=len(all_tests), desc="backend", unit="test")
+        
+        try:
+            for category_name, tests in prerequisite_tests:
+                total_passed += self.run_category(category_name, tests)
+                total_tests += len(tests)
             
-            category_passed = 0
-            for test_func in tests:
-                try:
-                    result = test_func()
-                    if result:
-                        category_passed += 1
-                    total_tests += 1
-                except Exception as e:
-                    self.log_result(test_func.__name__, False, f"Test execution error: {str(e)}")
-                    total_tests += 1
+            self.setup_shared_state()
             
-            total_passed += category_passed
-            print(f"   Category Result: {category_passed}/{len(tests)} tests passed")
+            with ThreadPoolExecutor(max_workers=max(len(background_tests), 1)) as background:
+                background_futures = [background.submit(self.run_test, t) for t in background_tests]
+                
+                # Core categories only depend on the prerequisites, so they run side by side
+                independent = [(name, tests) for name, tests in core_tests if name != "ISOLATED"]
+                with ThreadPoolExecutor(max_workers=CATEGORY_WORKERS) as categories:
+                    total_passed += sum(categories.map(lambda category: self.run_category(*category), independent))
+                total_tests += sum(len(tests) for _, tests in independent)
+                
+                if background_futures:
+                    # Isolated tests must run alone, so wait for the AI scans first
+                    total_passed += self.collect_background(background_futures)
+                    total_tests += len(background_futures)
+                
+                for category_name, tests in core_tests:
+                    if category_name == "ISOLATED":
+                        total_passed += self.run_category(category_name, tests)
+                        total_tests += len(tests)
+        finally:
+            self.teardown_shared_state()
+        
+        # Let the writer thread finish before printing the summary directly
+        self._log_q.join()
+        if self.progress is not None:
+            self.progress.close()
+            self.progress = None
+        save_durations(self.durations, self.shard_path(DURATIONS_PATH))
         
         # Final summary
         print("\n" + "=" * 80)
         print("📊 COMPREHENSIVE BACKEND TEST SUMMARY")
         print("=" * 80)
         
-        success_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
+        # Success rate in tenths of a percent; integer thresholds avoid float rounding at the boundaries
+        success_rate_x10 = (total_passed * 1000) // max(total_tests, 1)
         
         print(f"✅ Tests Passed: {total_passed}")
         print(f"❌ Tests Failed: {total_tests - total_passed}")
-        print(f"📈 Success Rate: {success_rate:.1f}%")
+        print(f"📈 Success Rate: {success_rate_x10 / 10:.1f}%")
         
-        if success_rate >= 90:
+        if success_rate_x10 >= 900:
             print("🎉 EXCELLENT: Backend is production ready!")
-        elif success_rate >= 80:
+        elif success_rate_x10 >= 800:
             print("✅ GOOD: Backend is mostly functional with minor issues")
-        elif success_rate >= 70:
+        elif success_rate_x10 >= 700:
             print("⚠️  FAIR: Backend has some issues that need attention")
         else:
             print("❌ POOR: Backend has significant issues requiring fixes")
@@ -1357,15 +1582,24 @@ class ComprehensiveBackendTester:
         print("\n📋 DETAILED TEST RESULTS:")
         print("-" * 50)
         for result in self.results:
-            status = "✅" if result['success'] else "❌"
-            print(f"{status} {result['test']}")
-            if result['details']:
-                print(f"   {result['details']}")
+            status = "✅" if result.success else "❌"
+            print(f"{status} {result.test}")
+            if result.details and VERBOSE:
+                print(f"   {result.details}")
         
-        return success_rate >= 80  # Return True if success rate is good
->>>>>>> c79b7619501b0f724bbf65a305cf406c59942f3a
+        self.save_results(total_passed, total_tests)
+        
+        return success_rate_x10 >= 800  # Return True if success rate is good
 
 if __name__ == "__main__":
-    tester = ComprehensiveBackendTester()
+    parser = argparse.ArgumentParser(description="Comprehensive backend tests for the Aman platform")
+    parser.add_argument("--online", action="store_true",
+                        help="also run AI scanning tests that call external LLM providers")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), metavar="I/N",
+                        help="run only the I-th of N round-robin slices of the core categories "
+                             "(1-based), e.g. launch --shard 1/4 ... --shard 4/4 in parallel")
+    args = parser.parse_args()
+    
+    tester = ComprehensiveBackendTester(online=args.online, shard=args.shard)
     success = tester.run_comprehensive_tests()
     sys.exit(0 if success else 1)
\ No newline at end of file
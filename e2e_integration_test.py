@@ -4,20 +4,158 @@ Aman Cybersecurity Platform - End-to-End Integration Testing
 Tests complete system workflows from user registration to threat detection
 """
 
+import argparse
+import hashlib
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import json
+from types import SimpleNamespace
 import time
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+
+# AMAN_TEST_VERBOSE=0 hides the per-step detail lines, which are logged at DEBUG
+VERBOSE = os.environ.get('AMAN_TEST_VERBOSE', '1') == '1'
+
+# Output goes through a queue so test threads never block on stdout; one listener thread writes it
+log = logging.getLogger("aman_e2e")
+log.setLevel(logging.DEBUG if VERBOSE else logging.INFO)
+log.propagate = False
+_log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stdout_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+@functools.lru_cache(maxsize=1)
+def _load_frontend_env():
+    """Parse frontend/.env into a dict once per process"""
+    env = {}
+    try:
+        with open('/app/frontend/.env', 'r') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                key, sep, value = line.partition('=')
+                if sep:
+                    env[key.strip()] = value.strip()
+    except Exception as e:
+        log.info(f"❌ Error reading frontend .env: {e}")
+    return env
+
+# Optional streaming JSON parser; the recent-emails check only needs the start of the body
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Optional fast JSON encoder for request bodies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(payload):
+    """Encode a request body once, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Emails for different threat levels: (name, body without recipient, expected risk)
+EMAIL_SCAN_CASES = (
+    ("Safe Email", {
+        "email_subject": "Weekly Team Meeting Reminder",
+        "sender": "team@company.com",
+        "email_body": "Hi team, just a reminder about our weekly team meeting tomorrow at 2 PM. Please bring your project updates."
+    }, "low"),
+    ("Suspicious Email", {
+        "email_subject": "Urgent: Verify Your Account Information",
+        "sender": "security@suspicious-domain.net",
+        "email_body": "Your account will be suspended unless you verify your information immediately. Click here to verify account details."
+    }, "medium"),
+    ("Phishing Email", {
+        "email_subject": "URGENT: Claim Your Prize Now! Limited Time Offer!",
+        "sender": "prizes@win-now.fake",
+        "email_body": "Congratulations! You've won $10,000! Click here immediately to claim your prize before it expires today. Verify account to proceed."
+    }, "high"),
+)
+
+# Links to scan, serialised once at import: (name, body, expected safe)
+LINK_SCAN_CASES = (
+    ("Safe Link", _dumps({"url": "https://www.google.com"}), True),
+    ("Shortened Link (Suspicious)", _dumps({"url": "https://bit.ly/suspicious-link"}), False),
+    ("Legitimate Business Link", _dumps({"url": "https://www.microsoft.com/security"}), True),
+)
+
+# Per-test results are appended here as NDJSON; the end-of-run summary goes to RESULTS_PATH
+RESULTS_LOG_PATH = "/app/e2e_test_results.ndjson"
+RESULTS_PATH = "/app/e2e_test_results.json"
+
+# Registered e2e users are cached here between runs, one file per backend URL
+USER_CACHE_DIR = os.path.expanduser("~/.cache/aman_e2e")
+# Backend refresh tokens last 7 days; stop trusting the cache a day early
+USER_CACHE_TTL = 6 * 24 * 3600
+
+def _rate(passed, total):
+    """Percentage of passed out of total; an empty total counts as 0%"""
+    return passed * 100.0 / max(total, 1)
+
+# Endpoint paths, resolved against the backend URL once per tester
+ENDPOINTS = {
+    "health": "/health",
+    "register": "/auth/register",
+    "login": "/auth/login",
+    "refresh": "/auth/refresh",
+    "settings": "/user/settings",
+    "stats": "/dashboard/stats",
+    "recent_emails": "/dashboard/recent-emails",
+    "scan_email": "/scan/email",
+    "scan_link": "/scan/link",
+    "scan_email_batch": "/scan/email/batch",
+    "scan_link_batch": "/scan/link/batch",
+}
+
+# Failure details that suggest the server is struggling rather than the test being wrong
+SERVER_PRESSURE_MARKERS = ('500', '502', '503', 'timed out')
+
+# Fields the dashboard stats endpoint must return
+STATS_REQUIRED = frozenset({'phishing_caught', 'safe_emails', 'potential_phishing'})
 
 class EndToEndTester:
-    def __init__(self):
+    def __init__(self, use_cache=True):
         # Get backend URL from frontend environment
         self.backend_url = self._get_backend_url()
         if not self.backend_url.endswith('/api'):
             self.backend_url = f"{self.backend_url}/api"
         
-        print(f"🔗 Testing end-to-end integration at: {self.backend_url}")
+        log.info(f"🔗 Testing end-to-end integration at: {self.backend_url}")
+        self.urls = SimpleNamespace(**{name: f"{self.backend_url}{path}" for name, path in ENDPOINTS.items()})
+        
+        # One pooled session so every call reuses the keep-alive connection to the backend
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        atexit.register(self.session.close)
         
         # Test data
         self.test_user = {
@@ -28,41 +166,118 @@ class EndToEndTester:
         }
         
         self.auth_token = None
-        self.test_results = []
+        self.refresh_token = None
+        # Results carry nanoseconds since this anchor; started_at in the summary maps them to wall time
+        self._epoch_wall = datetime.now(timezone.utc)
+        self._epoch_mono = time.monotonic_ns()
+        self._log_lock = threading.Lock()
+        try:
+            self._log_fp = open(RESULTS_LOG_PATH, 'w', buffering=1)
+            atexit.register(self._log_fp.close)
+        except OSError as e:
+            log.info(f"⚠️  Could not open results log {RESULTS_LOG_PATH}: {e}")
+            self._log_fp = None
+        self._backoff = 0.0
+        # Set once any test sees the token rejected, so concurrent tests can stop early
+        self._auth_invalid = threading.Event()
+        # Batch scan endpoints are optional; remember which ones the backend lacks
+        self._batch_supported = {}
+        
+        self.use_cache = use_cache
+        self.cache_hit = False
+        url_digest = hashlib.sha256(self.backend_url.encode()).hexdigest()
+        self.cache_path = os.path.join(USER_CACHE_DIR, f"{url_digest}.json")
         
     def _get_backend_url(self):
         """Get backend URL from frontend .env file"""
+        return _load_frontend_env().get('REACT_APP_BACKEND_URL', "http://localhost:8001")
+    
+    def _load_cached_user(self):
+        """Reuse a user registered by an earlier run, trading register+login for one token refresh"""
         try:
-            with open('/app/frontend/.env', 'r') as f:
-                for line in f:
-                    if line.startswith('REACT_APP_BACKEND_URL='):
-                        return line.split('=', 1)[1].strip()
-        except Exception as e:
-            print(f"❌ Error reading frontend .env: {e}")
-            return "http://localhost:8001"
-        return "http://localhost:8001"
+            with open(self.cache_path, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        # A hand-edited or truncated cache falls back to registering a fresh user
+        if not isinstance(cached, dict) or not isinstance(cached.get('user'), dict) \
+                or not isinstance(cached.get('refresh_token'), str):
+            return False
+        try:
+            if cached.get('expires_at', 0) <= time.time():
+                return False
+        except TypeError:
+            return False
+        
+        try:
+            response = self.session.post(
+                self.urls.refresh,
+                json={"refresh_token": cached['refresh_token']},
+                timeout=10
+            )
+        except requests.exceptions.RequestException:
+            return False
+        if response.status_code != 200:
+            return False
+        try:
+            access_token = response.json()['access_token']
+        except (KeyError, TypeError, ValueError):
+            return False
+        
+        self.test_user = cached['user']
+        self.refresh_token = cached['refresh_token']
+        self.auth_token = access_token
+        self.session.headers['Authorization'] = f"Bearer {self.auth_token}"
+        return True
+    
+    def _save_cached_user(self):
+        """Persist the registered user and refresh token, readable only by the current user"""
+        try:
+            os.makedirs(USER_CACHE_DIR, exist_ok=True)
+            fd = os.open(self.cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'user': self.test_user,
+                    'refresh_token': self.refresh_token,
+                    'expires_at': time.time() + USER_CACHE_TTL
+                }, f)
+            os.chmod(self.cache_path, 0o600)
+        except OSError as e:
+            log.info(f"⚠️  Could not cache e2e test user: {e}")
     
     def log_result(self, test_name, success, details):
         """Log test result"""
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} {test_name}")
-        if details:
-            print(f"   📋 {details}")
-        
-        self.test_results.append({
-            'test': test_name,
-            'success': success,
-            'details': details,
-            'timestamp': datetime.now().isoformat()
-        })
+        # One record per result so lines from concurrent tests don't interleave
+        msg = f"{status} {test_name}"
+        if details and log.isEnabledFor(logging.DEBUG):
+            msg += f"\n   📋 {details}"
+        log.info(msg)
+        
+        # Stream each result to disk instead of holding the whole run in memory
+        if self._log_fp is not None:
+            record = _dumps({
+                'test': test_name,
+                'success': success,
+                'details': details,
+                't_ns': time.monotonic_ns() - self._epoch_mono
+            }).decode('utf-8')
+            with self._log_lock:
+                self._log_fp.write(record + "\n")
+        
+        # Back off only while the server looks overloaded; decay back to zero once it recovers
+        if not success and any(marker in str(details) for marker in SERVER_PRESSURE_MARKERS):
+            self._backoff = min(self._backoff * 2 + 0.25, 2.0)
+        else:
+            self._backoff *= 0.5
         
         return success
     
     def test_system_health(self):
         """Test 1: System Health Check"""
-        print("\n🏥 TESTING SYSTEM HEALTH")
+        log.info("\n🏥 TESTING SYSTEM HEALTH")
         try:
-            response = requests.get(f"{self.backend_url}/health", timeout=10)
+            response = self.session.get(self.urls.health, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -94,10 +309,14 @@ class EndToEndTester:
     
     def test_user_registration(self):
         """Test 2: User Registration Flow"""
-        print("\n👤 TESTING USER REGISTRATION")
+        log.info("\n👤 TESTING USER REGISTRATION")
+        if self.cache_hit:
+            # Nothing was registered, so this run says nothing about the flow either way
+            log.info(f"⏭️  SKIP User Registration (reused cached user {self.test_user['email']})")
+            return None
         try:
-            response = requests.post(
-                f"{self.backend_url}/auth/register",
+            response = self.session.post(
+                self.urls.register,
                 json=self.test_user,
                 timeout=10
             )
@@ -111,10 +330,12 @@ class EndToEndTester:
                         f"User registered successfully: {self.test_user['email']}"
                     )
                 else:
+                    # %s is only rendered when debug output is on, so large payloads aren't repr()'d in quiet runs
+                    log.debug("   Registration response: %s", data)
                     return self.log_result(
                         "User Registration", 
                         False, 
-                        f"Registration response invalid: {data}"
+                        "Registration response invalid"
                     )
             else:
                 return self.log_result(
@@ -128,15 +349,18 @@ class EndToEndTester:
     
     def test_user_authentication(self):
         """Test 3: User Authentication Flow"""  
-        print("\n🔐 TESTING USER AUTHENTICATION")
+        log.info("\n🔐 TESTING USER AUTHENTICATION")
+        if self.cache_hit:
+            log.info("⏭️  SKIP User Authentication (access token refreshed from cached refresh token)")
+            return None
         try:
             login_data = {
                 "email": self.test_user["email"],
                 "password": self.test_user["password"]
             }
             
-            response = requests.post(
-                f"{self.backend_url}/auth/login",
+            response = self.session.post(
+                self.urls.login,
                 json=login_data,
                 timeout=10
             )
@@ -145,16 +369,21 @@ class EndToEndTester:
                 data = response.json()
                 if 'access_token' in data and 'refresh_token' in data:
                     self.auth_token = data['access_token']
+                    self.refresh_token = data['refresh_token']
+                    self.session.headers['Authorization'] = f"Bearer {self.auth_token}"
+                    if self.use_cache:
+                        self._save_cached_user()
                     return self.log_result(
                         "User Authentication", 
                         True, 
                         f"Login successful, token received (expires in {data.get('expires_in', 0)}s)"
                     )
                 else:
+                    log.debug("   Login response: %s", data)
                     return self.log_result(
                         "User Authentication", 
                         False, 
-                        f"Login response missing tokens: {data}"
+                        "Login response missing tokens"
                     )
             else:
                 return self.log_result(
@@ -168,7 +397,7 @@ class EndToEndTester:
     
     def test_protected_endpoints(self):
         """Test 4: Protected Endpoint Access"""
-        print("\n🛡️ TESTING PROTECTED ENDPOINT ACCESS")
+        log.info("\n🛡️ TESTING PROTECTED ENDPOINT ACCESS")
         
         if not self.auth_token:
             return self.log_result(
@@ -177,7 +406,6 @@ class EndToEndTester:
                 "No auth token available - authentication test must pass first"
             )
         
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
         endpoints_to_test = [
             ("/user/profile", "User Profile"),
             ("/dashboard/stats", "Dashboard Statistics"),
@@ -188,33 +416,83 @@ class EndToEndTester:
         passed_tests = 0
         total_tests = len(endpoints_to_test)
         
-        for endpoint, name in endpoints_to_test:
+        with ThreadPoolExecutor(max_workers=total_tests) as executor:
+            # Try the token on one endpoint first; a 401 there means every other probe would fail too
+            first_endpoint, _ = endpoints_to_test[0]
+            futures = [executor.submit(self.session.get, f"{self.backend_url}{first_endpoint}", timeout=10)]
             try:
-                response = requests.get(
-                    f"{self.backend_url}{endpoint}",
-                    headers=headers,
-                    timeout=10
-                )
+                token_rejected = futures[0].result().status_code == 401
+            except Exception:
+                token_rejected = False
+            
+            if token_rejected:
+                self._auth_invalid.set()
+                log.debug("   ⚠️ Skipping %d remaining endpoints (token invalid)", total_tests - 1)
+            else:
+                # The remaining GETs are independent, so issue them together and report in list order
+                futures += [
+                    executor.submit(self.session.get, f"{self.backend_url}{endpoint}", timeout=10)
+                    for endpoint, _ in endpoints_to_test[1:]
+                ]
+        
+        for (endpoint, name), future in zip(endpoints_to_test, futures):
+            try:
+                response = future.result()
                 
                 if response.status_code == 200:
                     passed_tests += 1
-                    print(f"   ✅ {name}: Working")
+                    log.debug("   ✅ %s: Working", name)
                 else:
-                    print(f"   ❌ {name}: Failed ({response.status_code})")
+                    log.debug("   ❌ %s: Failed (%s)", name, response.status_code)
                     
             except Exception as e:
-                print(f"   ❌ {name}: Error - {str(e)}")
+                log.debug("   ❌ %s: Error - %s", name, e)
         
-        success_rate = (passed_tests / total_tests) * 100
+        success_rate = _rate(passed_tests, total_tests)
         return self.log_result(
             "Protected Endpoint Access", 
             passed_tests >= 3,  # At least 3/4 should work
             f"{passed_tests}/{total_tests} endpoints working ({success_rate:.1f}% success rate)"
         )
     
+    def _scan_all(self, url, batch_url, bodies):
+        """Scan pre-encoded bodies, batched when the backend supports it; returns (result, error) per body"""
+        if self._batch_supported.get(batch_url, True):
+            try:
+                # The bodies are already JSON, so splice them into the batch envelope as bytes
+                response = self.session.post(batch_url, data=b'{"items":[' + b','.join(bodies) + b']}',
+                                             headers=JSON_HEADERS, timeout=30)
+                if response.status_code in (404, 405):
+                    self._batch_supported[batch_url] = False
+                elif response.status_code == 200:
+                    results = response.json().get('results', [])
+                    if len(results) == len(bodies):
+                        return [(result, None) for result in results]
+            except requests.exceptions.RequestException:
+                pass
+        
+        # No usable batch endpoint; each scan blocks on the AI backend, so run them all at once
+        with ThreadPoolExecutor(max_workers=len(bodies)) as executor:
+            futures = [
+                executor.submit(self.session.post, url, data=body, headers=JSON_HEADERS, timeout=15)
+                for body in bodies
+            ]
+        
+        outcomes = []
+        for future in futures:
+            try:
+                response = future.result()
+                if response.status_code == 200:
+                    outcomes.append((response.json(), None))
+                else:
+                    outcomes.append((None, f"Scan failed ({response.status_code})"))
+            except Exception as e:
+                outcomes.append((None, f"Error - {str(e)}"))
+        return outcomes
+    
     def test_email_scanning_workflow(self):
         """Test 5: Email Scanning Workflow"""
-        print("\n📧 TESTING EMAIL SCANNING WORKFLOW")
+        log.info("\n📧 TESTING EMAIL SCANNING WORKFLOW")
         
         if not self.auth_token:
             return self.log_result(
@@ -223,72 +501,34 @@ class EndToEndTester:
                 "No auth token available - authentication required"
             )
         
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        if self._auth_invalid.is_set():
+            return self.log_result("Email Scanning Workflow", False, "Auth token invalidated by earlier test")
         
-        # Test data for different threat levels
+        # Only the recipient varies per run, so each body is encoded once here
         test_emails = [
-            {
-                "name": "Safe Email",
-                "data": {
-                    "email_subject": "Weekly Team Meeting Reminder",
-                    "sender": "team@company.com",
-                    "recipient": self.test_user["email"],
-                    "email_body": "Hi team, just a reminder about our weekly team meeting tomorrow at 2 PM. Please bring your project updates."
-                },
-                "expected_risk": "low"
-            },
-            {
-                "name": "Suspicious Email", 
-                "data": {
-                    "email_subject": "Urgent: Verify Your Account Information",
-                    "sender": "security@suspicious-domain.net",
-                    "recipient": self.test_user["email"],
-                    "email_body": "Your account will be suspended unless you verify your information immediately. Click here to verify account details."
-                },
-                "expected_risk": "medium"
-            },
-            {
-                "name": "Phishing Email",
-                "data": {
-                    "email_subject": "URGENT: Claim Your Prize Now! Limited Time Offer!",
-                    "sender": "prizes@win-now.fake",
-                    "recipient": self.test_user["email"],
-                    "email_body": "Congratulations! You've won $10,000! Click here immediately to claim your prize before it expires today. Verify account to proceed."
-                },
-                "expected_risk": "high"
-            }
+            (name, _dumps({**data, "recipient": self.test_user["email"]}))
+            for name, data, _ in EMAIL_SCAN_CASES
         ]
         
         successful_scans = 0
         total_scans = len(test_emails)
         
-        for email_test in test_emails:
-            try:
-                response = requests.post(
-                    f"{self.backend_url}/scan/email",
-                    json=email_test["data"],
-                    headers=headers,
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    scan_result = response.json()
-                    risk_score = scan_result.get('risk_score', 0)
-                    status = scan_result.get('status', 'unknown')
-                    
-                    # Validate scan results make sense
-                    if 'id' in scan_result and 'explanation' in scan_result:
-                        successful_scans += 1
-                        print(f"   ✅ {email_test['name']}: {status.upper()} (Risk: {risk_score}%)")
-                    else:
-                        print(f"   ❌ {email_test['name']}: Invalid scan result format")
-                else:
-                    print(f"   ❌ {email_test['name']}: Scan failed ({response.status_code})")
-                    
-            except Exception as e:
-                print(f"   ❌ {email_test['name']}: Error - {str(e)}")
+        outcomes = self._scan_all(self.urls.scan_email, self.urls.scan_email_batch, [body for _, body in test_emails])
+        for (name, _), (scan_result, error) in zip(test_emails, outcomes):
+            if scan_result is None:
+                log.debug("   ❌ %s: %s", name, error)
+                continue
+            risk_score = scan_result.get('risk_score', 0)
+            status = scan_result.get('status', 'unknown')
+            
+            # Validate scan results make sense
+            if 'id' in scan_result and 'explanation' in scan_result:
+                successful_scans += 1
+                log.debug("   ✅ %s: %s (Risk: %s%%)", name, status.upper(), risk_score)
+            else:
+                log.debug("   ❌ %s: Invalid scan result format", name)
         
-        success_rate = (successful_scans / total_scans) * 100
+        success_rate = _rate(successful_scans, total_scans)
         return self.log_result(
             "Email Scanning Workflow", 
             successful_scans >= 2,  # At least 2/3 should work
@@ -297,7 +537,7 @@ class EndToEndTester:
     
     def test_link_scanning_workflow(self):
         """Test 6: Link Scanning Workflow"""
-        print("\n🔗 TESTING LINK SCANNING WORKFLOW")
+        log.info("\n🔗 TESTING LINK SCANNING WORKFLOW")
         
         if not self.auth_token:
             return self.log_result(
@@ -306,55 +546,29 @@ class EndToEndTester:
                 "No auth token available - authentication required"
             )
         
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
-        
-        test_links = [
-            {
-                "name": "Safe Link",
-                "url": "https://www.google.com",
-                "expected_safe": True
-            },
-            {
-                "name": "Shortened Link (Suspicious)",
-                "url": "https://bit.ly/suspicious-link",
-                "expected_safe": False
-            },
-            {
-                "name": "Legitimate Business Link",
-                "url": "https://www.microsoft.com/security",
-                "expected_safe": True
-            }
-        ]
+        if self._auth_invalid.is_set():
+            return self.log_result("Link Scanning Workflow", False, "Auth token invalidated by earlier test")
+        
+        test_links = LINK_SCAN_CASES
         
         successful_scans = 0
         total_scans = len(test_links)
         
-        for link_test in test_links:
-            try:
-                response = requests.post(
-                    f"{self.backend_url}/scan/link",
-                    json={"url": link_test["url"]},
-                    headers=headers,
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    scan_result = response.json()
-                    risk_score = scan_result.get('risk_score', 0)
-                    status = scan_result.get('status', 'unknown')
-                    
-                    if 'url' in scan_result and 'explanation' in scan_result:
-                        successful_scans += 1
-                        print(f"   ✅ {link_test['name']}: {status.upper()} (Risk: {risk_score}%)")
-                    else:
-                        print(f"   ❌ {link_test['name']}: Invalid scan result format")
-                else:
-                    print(f"   ❌ {link_test['name']}: Scan failed ({response.status_code})")
-                    
-            except Exception as e:
-                print(f"   ❌ {link_test['name']}: Error - {str(e)}")
+        outcomes = self._scan_all(self.urls.scan_link, self.urls.scan_link_batch, [body for _, body, _ in test_links])
+        for (name, _, _), (scan_result, error) in zip(test_links, outcomes):
+            if scan_result is None:
+                log.debug("   ❌ %s: %s", name, error)
+                continue
+            risk_score = scan_result.get('risk_score', 0)
+            status = scan_result.get('status', 'unknown')
+            
+            if 'url' in scan_result and 'explanation' in scan_result:
+                successful_scans += 1
+                log.debug("   ✅ %s: %s (Risk: %s%%)", name, status.upper(), risk_score)
+            else:
+                log.debug("   ❌ %s: Invalid scan result format", name)
         
-        success_rate = (successful_scans / total_scans) * 100
+        success_rate = _rate(successful_scans, total_scans)
         return self.log_result(
             "Link Scanning Workflow", 
             successful_scans >= 2,  # At least 2/3 should work
@@ -363,7 +577,7 @@ class EndToEndTester:
     
     def test_dashboard_integration(self):
         """Test 7: Dashboard Data Integration"""
-        print("\n📊 TESTING DASHBOARD INTEGRATION")
+        log.info("\n📊 TESTING DASHBOARD INTEGRATION")
         
         if not self.auth_token:
             return self.log_result(
@@ -372,33 +586,27 @@ class EndToEndTester:
                 "No auth token available - authentication required"
             )
         
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        if self._auth_invalid.is_set():
+            return self.log_result("Dashboard Integration", False, "Auth token invalidated by earlier test")
         
         try:
-            # Test dashboard stats
-            stats_response = requests.get(
-                f"{self.backend_url}/dashboard/stats",
-                headers=headers,
-                timeout=10
-            )
-            
-            # Test recent emails
-            emails_response = requests.get(
-                f"{self.backend_url}/dashboard/recent-emails",
-                headers=headers,
-                timeout=10
-            )
+            # Fetch dashboard stats and recent emails together on two pooled connections
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                stats_future = executor.submit(self.session.get, self.urls.stats, timeout=10)
+                emails_future = executor.submit(self.session.get, self.urls.recent_emails,
+                                                timeout=10, stream=IJSON_AVAILABLE)
+            stats_response = stats_future.result()
+            emails_response = emails_future.result()
             
             stats_working = stats_response.status_code == 200
             emails_working = emails_response.status_code == 200
             
             if stats_working and emails_working:
                 stats_data = stats_response.json()
-                emails_data = emails_response.json()
                 
                 # Validate data structure
-                has_stats_fields = all(field in stats_data for field in ['phishing_caught', 'safe_emails', 'potential_phishing'])
-                has_emails_array = 'emails' in emails_data and isinstance(emails_data['emails'], list)
+                has_stats_fields = STATS_REQUIRED.issubset(stats_data)
+                has_emails_array = self._has_emails_array(emails_response)
                 
                 if has_stats_fields and has_emails_array:
                     total_scans = stats_data.get('total_scans', 0)
@@ -415,6 +623,7 @@ class EndToEndTester:
                         "Dashboard data format invalid"
                     )
             else:
+                emails_response.close()
                 return self.log_result(
                     "Dashboard Integration", 
                     False, 
@@ -424,9 +633,19 @@ class EndToEndTester:
         except Exception as e:
             return self.log_result("Dashboard Integration", False, f"Dashboard integration error: {str(e)}")
     
+    def _has_emails_array(self, response):
+        """Check the recent-emails body has an 'emails' list, streaming only up to its first token when ijson is installed"""
+        with response:
+            if IJSON_AVAILABLE:
+                response.raw.decode_content = True
+                return any(prefix == 'emails' and event == 'start_array'
+                           for prefix, event, _ in ijson.parse(response.raw))
+            data = response.json()
+            return 'emails' in data and isinstance(data['emails'], list)
+    
     def test_user_settings_persistence(self):
         """Test 8: User Settings Persistence"""
-        print("\n⚙️ TESTING USER SETTINGS PERSISTENCE")
+        log.info("\n⚙️ TESTING USER SETTINGS PERSISTENCE")
         
         if not self.auth_token:
             return self.log_result(
@@ -435,13 +654,13 @@ class EndToEndTester:
                 "No auth token available - authentication required"
             )
         
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        if self._auth_invalid.is_set():
+            return self.log_result("Settings Persistence", False, "Auth token invalidated by earlier test")
         
         try:
             # Get current settings
-            get_response = requests.get(
-                f"{self.backend_url}/user/settings",
-                headers=headers,
+            get_response = self.session.get(
+                self.urls.settings,
                 timeout=10
             )
             
@@ -461,10 +680,9 @@ class EndToEndTester:
                 "share_threat_intelligence": True
             }
             
-            put_response = requests.put(
-                f"{self.backend_url}/user/settings",
+            put_response = self.session.put(
+                self.urls.settings,
                 json=new_settings,
-                headers=headers,
                 timeout=10
             )
             
@@ -476,18 +694,14 @@ class EndToEndTester:
                 )
             
             # Verify settings were saved
-            verify_response = requests.get(
-                f"{self.backend_url}/user/settings",
-                headers=headers,
+            verify_response = self.session.get(
+                self.urls.settings,
                 timeout=10
             )
             
             if verify_response.status_code == 200:
                 saved_settings = verify_response.json()
-                settings_match = all(
-                    saved_settings.get(key) == value 
-                    for key, value in new_settings.items()
-                )
+                settings_match = new_settings.items() <= saved_settings.items()
                 
                 if settings_match:
                     return self.log_result(
@@ -513,14 +727,18 @@ class EndToEndTester:
     
     def run_all_tests(self):
         """Run all end-to-end tests"""
-        print("🚀 STARTING END-TO-END INTEGRATION TESTING")
-        print("=" * 60)
+        log.info("🚀 STARTING END-TO-END INTEGRATION TESTING")
+        log.info("=" * 60)
         
-        # Run tests in logical order
-        tests = [
+        # Registration and login depend on each other, so these run in logical order
+        sequential_tests = [
             self.test_system_health,
             self.test_user_registration,
-            self.test_user_authentication,
+            self.test_user_authentication
+        ]
+        
+        # Everything after login only needs the token and touches separate endpoints
+        concurrent_tests = [
             self.test_protected_endpoints,
             self.test_email_scanning_workflow,
             self.test_link_scanning_workflow, 
@@ -529,54 +747,78 @@ class EndToEndTester:
         ]
         
         passed = 0
-        total = len(tests)
-        
-        for test in tests:
-            if test():
+        total = len(sequential_tests) + len(concurrent_tests)
+        
+        if self.use_cache:
+            self.cache_hit = self._load_cached_user()
+            if self.cache_hit:
+                log.info(f"♻️  Reusing cached e2e user {self.test_user['email']}")
+        
+        skipped = 0
+        for test in sequential_tests:
+            result = test()
+            if result is None:
+                skipped += 1
+            elif result:
                 passed += 1
-            time.sleep(1)  # Brief pause between tests
+            if self._backoff:
+                time.sleep(self._backoff)
+        
+        with ThreadPoolExecutor(max_workers=len(concurrent_tests)) as executor:
+            futures = [executor.submit(test) for test in concurrent_tests]
+        passed += sum(1 for future in futures if future.result())
+        # Skipped tests are left out of the rate instead of counting as passes
+        total -= skipped
         
         # Print summary
-        print("\n" + "=" * 60)
-        print("🏁 END-TO-END TESTING SUMMARY")
-        print("=" * 60)
+        log.info("\n" + "=" * 60)
+        log.info("🏁 END-TO-END TESTING SUMMARY")
+        log.info("=" * 60)
         
-        success_rate = (passed / total) * 100
-        print(f"📊 OVERALL RESULTS: {passed}/{total} tests passed ({success_rate:.1f}%)")
+        success_rate = _rate(passed, total)
+        log.info(f"📊 OVERALL RESULTS: {passed}/{total} tests passed ({success_rate:.1f}%)"
+                 + (f", {skipped} skipped" if skipped else ""))
         
         if success_rate >= 85:
-            print("🟢 RESULT: EXCELLENT - System ready for production")
+            log.info("🟢 RESULT: EXCELLENT - System ready for production")
             system_status = "PRODUCTION READY"
         elif success_rate >= 70:  
-            print("🟡 RESULT: GOOD - Minor issues to address")
+            log.info("🟡 RESULT: GOOD - Minor issues to address")
             system_status = "MOSTLY READY"
         elif success_rate >= 50:
-            print("🟠 RESULT: FAIR - Several issues need fixing")
+            log.info("🟠 RESULT: FAIR - Several issues need fixing")
             system_status = "NEEDS WORK"
         else:
-            print("🔴 RESULT: POOR - Major issues require attention")
+            log.info("🔴 RESULT: POOR - Major issues require attention")
             system_status = "NOT READY"
         
-        print(f"🎯 SYSTEM STATUS: {system_status}")
+        log.info(f"🎯 SYSTEM STATUS: {system_status}")
         
-        # Save detailed results
+        # Per-test results are already on disk; only the totals are written here
         results_summary = {
             "timestamp": datetime.now().isoformat(),
+            "started_at": self._epoch_wall.isoformat(),
             "total_tests": total,
             "passed_tests": passed,
+            "skipped_tests": skipped,
             "success_rate": success_rate,
             "system_status": system_status,
-            "detailed_results": self.test_results
+            "results_log": RESULTS_LOG_PATH
         }
         
-        with open('/app/e2e_test_results.json', 'w') as f:
+        with open(RESULTS_PATH, 'w') as f:
             json.dump(results_summary, f, indent=2)
         
-        print(f"📝 Detailed results saved to: /app/e2e_test_results.json")
+        log.info(f"📝 Summary saved to: {RESULTS_PATH}, per-test results in: {RESULTS_LOG_PATH}")
         
         return success_rate >= 70  # Consider 70%+ as passing
 
 if __name__ == "__main__":
-    tester = EndToEndTester()
+    parser = argparse.ArgumentParser(description="End-to-end integration tests for the Aman platform")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="register a fresh user instead of reusing the cached one")
+    args = parser.parse_args()
+    
+    tester = EndToEndTester(use_cache=not args.no_cache)
     success = tester.run_all_tests()
     sys.exit(0 if success else 1)
\ No newline at end of file
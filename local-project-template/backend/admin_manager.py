@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from auth import invalidate_cached_user
 from database import get_database
 from models import UserResponse
 
@@ -245,6 +246,9 @@ class AdminManager:
                 }
             )
             
+            # Authenticated requests read users through a short-lived cache
+            invalidate_cached_user(user_id=target_user_id)
+            
             if result.modified_count > 0:
                 # Log admin action
                 await self._log_admin_action(admin_user_id, "USER_STATUS_UPDATE", {
@@ -281,6 +285,8 @@ class AdminManager:
                 }
             )
             
+            invalidate_cached_user(user_id=target_user_id)
+            
             if result.modified_count > 0:
                 # Log admin action
                 await self._log_admin_action(admin_user_id, "USER_ROLE_UPDATE", {
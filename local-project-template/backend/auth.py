@@ -5,15 +5,23 @@ Implements JWT authentication, password hashing, and security utilities
 
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+# PyJWT: HMAC signatures go through OpenSSL rather than a pure-Python path
+import jwt
+from jwt import PyJWTError
 from passlib.context import CryptContext
+# Native bcrypt backend; import it directly so a missing C extension fails at startup
+# instead of passlib silently picking a much slower fallback
+import bcrypt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
 import os
 import secrets
-import string
+import time
+import weakref
 from pydantic import BaseModel, EmailStr
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from database import get_database
 
 # Security configuration
@@ -22,8 +30,51 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Account lockout after repeated failed logins
+MAX_FAILED_LOGIN_ATTEMPTS = 5
+LOCKOUT_MINUTES = 15
+
+# Password strength rules
+PASSWORD_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+PASSWORD_SCAN_LIMIT = 256
+
+# Argon2id is preferred when argon2-cffi is installed; bcrypt hashes are upgraded on login
+try:
+    import argon2
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+assert bcrypt.__version__, "bcrypt C backend is required"
+if ARGON2_AVAILABLE:
+    pwd_context = CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated=["bcrypt"],
+        bcrypt__ident="2b",
+        bcrypt__default_rounds=12
+    )
+else:
+    pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__ident="2b", bcrypt__default_rounds=12)
+
+# Bcrypt is CPU-bound; passlib's bcrypt backend drops the GIL inside the C hash,
+# so running it on this pool keeps the event loop free and scales with cores
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Short-lived user cache for the auth hot path; entries are (expires_at, UserInDB)
+USER_CACHE_TTL = 30
+USER_CACHE_MAXSIZE = 10_000
+_user_cache_by_id: Dict[str, tuple] = {}
+_user_cache_by_email: Dict[str, tuple] = {}
+# One lock per lookup key so concurrent misses share a single database query
+_user_lookup_locks = weakref.WeakValueDictionary()
+# Latest known token_version per user id; tokens carrying an older "tv" are rejected without a lookup
+_token_versions: Dict[str, int] = {}
+
+# Decoded tokens, keyed by (token, type); entries are (expires_at, TokenData) and never outlive the token's exp
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAXSIZE = 50_000
+_token_cache: Dict[tuple, tuple] = {}
 
 # HTTP Bearer for token authentication
 security = HTTPBearer()
@@ -38,6 +89,10 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[str] = None
     email: Optional[str] = None
+    is_active: bool = True
+    token_version: int = 0
+    organization: Optional[str] = None
+    expires_at: float = 0
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -60,6 +115,7 @@ class UserInDB(BaseModel):
     last_login: Optional[datetime] = None
     failed_login_attempts: int = 0
     locked_until: Optional[datetime] = None
+    token_version: int = 0
 
 class UserResponse(BaseModel):
     id: str
@@ -71,25 +127,30 @@ class UserResponse(BaseModel):
     last_login: Optional[datetime] = None
 
 # Password utilities
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_POOL, pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_POOL, pwd_context.hash, password)
 
 def validate_password_strength(password: str) -> bool:
     """Validate password strength"""
     if len(password) < 8:
         return False
     
-    has_upper = any(c.isupper() for c in password)
-    has_lower = any(c.islower() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
-    
-    return all([has_upper, has_lower, has_digit, has_special])
+    # Each category check runs in C (map over the str methods, frozenset.isdisjoint) rather than a
+    # Python-level loop per character. Only the first PASSWORD_SCAN_LIMIT characters are inspected
+    scanned = password[:PASSWORD_SCAN_LIMIT]
+    return (
+        any(map(str.isupper, scanned))
+        and any(map(str.islower, scanned))
+        and any(map(str.isdigit, scanned))
+        and not PASSWORD_SPECIAL_CHARS.isdisjoint(scanned)
+    )
 
 # JWT token utilities
 def create_access_token(data: Dict[Any, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -114,7 +175,30 @@ def create_refresh_token(data: Dict[Any, Any]) -> str:
     return encoded_jwt
 
 def verify_token(token: str, token_type: str = "access") -> Optional[TokenData]:
-    """Verify and decode JWT token"""
+    """Verify and decode JWT token, reusing a recent decode of the same token"""
+    cache_key = (token, token_type)
+    entry = _token_cache.get(cache_key)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            return entry[1]
+        _token_cache.pop(cache_key, None)
+    
+    token_data = _decode_token(token, token_type)
+    if token_data is not None:
+        _cache_token(cache_key, token_data)
+    return token_data
+
+def _cache_token(cache_key: tuple, token_data: TokenData):
+    """Remember a decoded token until TOKEN_CACHE_TTL or its own expiry, whichever is sooner"""
+    remaining = token_data.expires_at - time.time()
+    if remaining <= 0:
+        return
+    _token_cache[cache_key] = (time.monotonic() + min(TOKEN_CACHE_TTL, remaining), token_data)
+    if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+        del _token_cache[next(iter(_token_cache))]
+
+def _decode_token(token: str, token_type: str) -> Optional[TokenData]:
+    """Verify a JWT signature and claims"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
@@ -128,28 +212,78 @@ def verify_token(token: str, token_type: str = "access") -> Optional[TokenData]:
         if user_id is None or email is None:
             return None
             
-        return TokenData(user_id=user_id, email=email)
-    except JWTError:
+        return TokenData(
+            user_id=user_id,
+            email=email,
+            is_active=payload.get("active", True),
+            token_version=payload.get("tv", 0),
+            organization=payload.get("org"),
+            expires_at=payload.get("exp", 0)
+        )
+    except PyJWTError:
+        return None
+
+# User cache helpers
+def _get_cached_user(cache: Dict[str, tuple], key: str) -> Optional[UserInDB]:
+    """Return a cached user if the entry has not expired"""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] > time.monotonic():
+        return entry[1]
+    cache.pop(key, None)
+    return None
+
+def _cache_user(user: UserInDB):
+    """Store a user under both its id and email"""
+    expires_at = time.monotonic() + USER_CACHE_TTL
+    for cache, key in ((_user_cache_by_id, user.id), (_user_cache_by_email, user.email)):
+        # Re-insert so dict order stays oldest-first for eviction
+        cache.pop(key, None)
+        cache[key] = (expires_at, user)
+        if len(cache) > USER_CACHE_MAXSIZE:
+            del cache[next(iter(cache))]
+
+def invalidate_cached_user(user_id: Optional[str] = None, email: Optional[str] = None):
+    """Drop a user from the cache after their record changes"""
+    if user_id is not None:
+        entry = _user_cache_by_id.pop(user_id, None)
+        if entry is not None:
+            _user_cache_by_email.pop(entry[1].email, None)
+    if email is not None:
+        entry = _user_cache_by_email.pop(email, None)
+        if entry is not None:
+            _user_cache_by_id.pop(entry[1].id, None)
+
+async def _load_user(cache: Dict[str, tuple], field: str, value: str) -> Optional[UserInDB]:
+    """Look a user up through the cache, coalescing concurrent misses into one query"""
+    user = _get_cached_user(cache, value)
+    if user is not None:
+        return user
+    
+    lock = _user_lookup_locks.setdefault(f"{field}:{value}", asyncio.Lock())
+    async with lock:
+        # Another request may have filled the cache while we waited
+        user = _get_cached_user(cache, value)
+        if user is not None:
+            return user
+        
+        db = get_database()
+        user_doc = await db.users.find_one({field: value})
+        if user_doc:
+            user = UserInDB(**user_doc)
+            _cache_user(user)
+            return user
         return None
 
 # Database operations for users
 async def get_user_by_email(email: str) -> Optional[UserInDB]:
     """Get user from database by email"""
-    db = get_database()
-    user_doc = await db.users.find_one({"email": email})
-    
-    if user_doc:
-        return UserInDB(**user_doc)
-    return None
+    return await _load_user(_user_cache_by_email, "email", email)
 
 async def get_user_by_id(user_id: str) -> Optional[UserInDB]:
     """Get user from database by ID"""
-    db = get_database()
-    user_doc = await db.users.find_one({"id": user_id})
-    
-    if user_doc:
-        return UserInDB(**user_doc)
-    return None
+    return await _load_user(_user_cache_by_id, "id", user_id)
 
 async def create_user(user_create: UserCreate) -> UserInDB:
     """Create new user in database"""
@@ -172,7 +306,7 @@ async def create_user(user_create: UserCreate) -> UserInDB:
     
     # Create user document
     user_id = str(uuid.uuid4())
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = await get_password_hash(user_create.password)
     
     user_doc = {
         "id": user_id,
@@ -188,6 +322,7 @@ async def create_user(user_create: UserCreate) -> UserInDB:
     }
     
     await db.users.insert_one(user_doc)
+    invalidate_cached_user(email=user_create.email)
     return UserInDB(**user_doc)
 
 async def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
@@ -206,31 +341,39 @@ async def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
         )
     
     # Verify password
-    if not verify_password(password, user.hashed_password):
-        # Increment failed login attempts
+    if not await verify_password(password, user.hashed_password):
+        # Increment failed login attempts and decide the lock from the incremented value
+        # server-side, so concurrent failures can't race on a stale read
         await db.users.update_one(
             {"id": user.id},
-            {
-                "$inc": {"failed_login_attempts": 1},
-                "$set": {
-                    "locked_until": datetime.utcnow() + timedelta(minutes=15) 
-                    if user.failed_login_attempts >= 4 else None
-                }
-            }
+            [
+                {"$set": {"failed_login_attempts": {"$add": [{"$ifNull": ["$failed_login_attempts", 0]}, 1]}}},
+                {"$set": {
+                    "locked_until": {
+                        "$cond": [
+                            {"$gte": ["$failed_login_attempts", MAX_FAILED_LOGIN_ATTEMPTS]},
+                            {"$add": ["$$NOW", LOCKOUT_MINUTES * 60 * 1000]},
+                            None
+                        ]
+                    }
+                }}
+            ]
         )
+        # The lockout check reads failed_login_attempts, so it must not come from a stale entry
+        invalidate_cached_user(user_id=user.id)
         return None
     
     # Reset failed login attempts and update last login
-    await db.users.update_one(
-        {"id": user.id},
-        {
-            "$set": {
-                "failed_login_attempts": 0,
-                "locked_until": None,
-                "last_login": datetime.utcnow()
-            }
-        }
-    )
+    updates = {
+        "failed_login_attempts": 0,
+        "locked_until": None,
+        "last_login": datetime.utcnow()
+    }
+    # Rehash with the preferred scheme while we have the plaintext
+    if pwd_context.needs_update(user.hashed_password):
+        updates["hashed_password"] = await get_password_hash(password)
+    await db.users.update_one({"id": user.id}, {"$set": updates})
+    invalidate_cached_user(user_id=user.id)
     
     return user
 
@@ -241,6 +384,7 @@ async def update_user_last_login(user_id: str):
         {"id": user_id},
         {"$set": {"last_login": datetime.utcnow()}}
     )
+    invalidate_cached_user(user_id=user_id)
 
 # Authentication dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserInDB:
@@ -257,9 +401,21 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if token_data is None:
         raise credentials_exception
     
+    # The token's own claims settle inactive and revoked users without touching the database
+    if not token_data.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    if token_data.token_version < _token_versions.get(token_data.user_id, 0):
+        raise credentials_exception
+    
     user = await get_user_by_id(token_data.user_id)
     if user is None:
         raise credentials_exception
+    _token_versions[user.id] = user.token_version
+    if user.token_version != token_data.token_version:
+        raise credentials_exception
         
     if not user.is_active:
         raise HTTPException(
@@ -280,23 +436,30 @@ async def get_current_active_user(current_user: UserInDB = Depends(get_current_u
 
 # Utility functions
 def generate_secure_token(length: int = 32) -> str:
-    """Generate a secure random token"""
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    """Generate a secure URL-safe random token"""
+    # token_urlsafe draws about 1.3 characters per byte, so length bytes always yield at least length characters
+    return secrets.token_urlsafe(length)[:length]
 
 async def revoke_user_tokens(user_id: str):
-    """Revoke all tokens for a user (implement token blacklist if needed)"""
-    # This would typically involve adding tokens to a blacklist
-    # For now, we'll just update the user's token version
+    """Revoke all tokens for a user by bumping their token version"""
     db = get_database()
     await db.users.update_one(
         {"id": user_id},
         {"$inc": {"token_version": 1}}
     )
+    # Tokens carry the version they were issued with; older ones now fail the "tv" check
+    _token_versions[user_id] = _token_versions.get(user_id, 0) + 1
+    invalidate_cached_user(user_id=user_id)
 
 def create_token_response(user: UserInDB) -> Token:
     """Create token response for authenticated user"""
-    token_data = {"sub": user.id, "email": user.email}
+    token_data = {
+        "sub": user.id,
+        "email": user.email,
+        "active": user.is_active,
+        "tv": user.token_version,
+        "org": user.organization
+    }
     
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
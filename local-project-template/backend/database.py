@@ -48,6 +48,7 @@ async def init_collections():
     
     # Users collection
     await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
     await db.users.create_index("organization")
     await db.users.create_index("is_active")
     await db.users.create_index("created_at")
@@ -57,6 +58,8 @@ async def init_collections():
     await db.email_scans.create_index("scanned_at")
     await db.email_scans.create_index("scan_result")
     await db.email_scans.create_index([("user_id", 1), ("scanned_at", -1)])
+    # Real-time dashboard statistics filter on user_id and created_at
+    await db.email_scans.create_index([("user_id", 1), ("created_at", -1)])
     await db.email_scans.create_index("sender")
     
     # Threat logs collection
@@ -128,6 +131,9 @@ class UserDatabase:
             {"id": user_id},
             {"$set": update_data}
         )
+        # Imported here because auth imports this module
+        from auth import invalidate_cached_user
+        invalidate_cached_user(user_id=user_id)
         return result.modified_count > 0
     
     @staticmethod
@@ -23,7 +23,7 @@ from contextlib import asynccontextmanager
 from email_scanner import scan_email_advanced, scan_link_advanced
 from ai_scanner import scan_email_with_ai, scan_link_with_ai
 from feedback_system import submit_scan_feedback, get_user_feedback_analytics
-from threat_intelligence import check_domain_reputation, check_url_reputation
+from threat_intelligence import check_domain_reputation, check_url_reputation, close_threat_intelligence
 from realtime_manager import realtime_manager, notify_threat_detected, notify_scan_completed
 from admin_manager import (
     get_admin_dashboard_stats, get_user_management_data, 
@@ -74,6 +74,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    await close_threat_intelligence()
     await close_mongo_connection()
     logger.info("Application shutdown completed")
 
@@ -253,7 +254,7 @@ async def refresh_token(request: Request, refresh_data: RefreshTokenRequest):
         
         # Get user
         user = await get_user_by_id(token_data.user_id)
-        if not user or not user.is_active:
+        if not user or not user.is_active or user.token_version != token_data.token_version:
             raise HTTPException(
                 status_code=401,
                 detail="User not found or inactive"
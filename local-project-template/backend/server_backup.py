@@ -20,7 +20,7 @@ import logging
 from email_scanner import scan_email_advanced, scan_link_advanced
 from ai_scanner import scan_email_with_ai, scan_link_with_ai
 from feedback_system import submit_scan_feedback, get_user_feedback_analytics
-from threat_intelligence import check_domain_reputation, check_url_reputation
+from threat_intelligence import check_domain_reputation, check_url_reputation, close_threat_intelligence
 from models import (
     UserCreate, UserResponse, LoginRequest, Token, RefreshTokenRequest,
     EmailScanRequest, EmailScanResponse, DashboardStats, DashboardData,
@@ -103,6 +103,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Aman Cybersecurity Platform...")
+    await close_threat_intelligence()
     await close_mongo_connection()
     logger.info("✅ Shutdown completed")
 
@@ -6,17 +6,63 @@ Handles live dashboard updates, threat notifications, and real-time statistics
 import json
 import asyncio
 import logging
+import time
 from typing import Dict, Set, List, Any, Optional
 from datetime import datetime, timedelta
 import uuid
+from collections import defaultdict
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 from fastapi import WebSocket, WebSocketDisconnect
 from database import get_database
 
+# Optional fast JSON encoder for WebSocket frames
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional MessagePack encoder for clients that negotiate the "msgpack" subprotocol
+try:
+    import ormsgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# WebSocket subprotocol that switches a connection to binary MessagePack frames
+MSGPACK_SUBPROTOCOL = "msgpack"
+
 logger = logging.getLogger(__name__)
 
+# Users whose statistics are refreshed at once on each periodic tick; well under motor's default pool of 100
+STATS_UPDATE_CONCURRENCY = 32
+# Seconds between periodic statistics updates
+STATS_UPDATE_INTERVAL = 30
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """Serialize a message for a WebSocket text frame"""
+    if ORJSON_AVAILABLE:
+        # The dashboard parses event.data as a string, so frames stay text rather than binary
+        return orjson.dumps(data, option=orjson.OPT_NAIVE_UTC).decode()
+    return json.dumps(data)
+
+def _encode(data: Dict[str, Any], use_msgpack: bool):
+    """Serialize a message for a connection: MessagePack bytes or JSON text"""
+    if use_msgpack:
+        return ormsgpack.packb(data, option=ormsgpack.OPT_NAIVE_UTC)
+    return _dumps(data)
+
+def _now_ms() -> int:
+    """Current time as epoch milliseconds for message timestamps; clients format it themselves"""
+    return int(time.time() * 1000)
+
+def _utc_day_bounds() -> tuple:
+    """Return the start of today and of tomorrow in UTC"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today, today + timedelta(days=1)
+
 class NotificationType(str, Enum):
     THREAT_DETECTED = "threat_detected"
     SCAN_COMPLETED = "scan_completed"
@@ -32,6 +78,7 @@ class WebSocketConnection:
     connected_at: datetime
     organization_id: Optional[str] = None
     subscription_types: Set[str] = None
+    use_msgpack: bool = False  # negotiated "msgpack" subprotocol; JSON text frames otherwise
 
     def __post_init__(self):
         if self.subscription_types is None:
@@ -64,15 +111,19 @@ class RealTimeManager:
     
     def __init__(self):
         self.connections: Dict[str, WebSocketConnection] = {}
-        self.user_connections: Dict[str, Set[str]] = {}  # user_id -> set of connection_ids
-        self.organization_connections: Dict[str, Set[str]] = {}  # org_id -> set of connection_ids
+        self.user_connections: Dict[str, Set[str]] = defaultdict(set)  # user_id -> set of connection_ids
+        self.organization_connections: Dict[str, Set[str]] = defaultdict(set)  # org_id -> set of connection_ids
         self.notification_queue: asyncio.Queue = asyncio.Queue()
         self.background_tasks: Set[asyncio.Task] = set()
+        # user_id -> fingerprint of the last statistics pushed, to skip unchanged periodic updates
+        self._last_stats_hash: Dict[str, int] = {}
         
     async def connect(self, websocket: WebSocket, user_id: str, organization_id: Optional[str] = None) -> str:
         """Accept a WebSocket connection"""
         try:
-            await websocket.accept()
+            # Clients that ask for MessagePack get binary frames; everyone else keeps JSON
+            use_msgpack = MSGPACK_AVAILABLE and MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+            await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if use_msgpack else None)
             connection_id = str(uuid.uuid4())
             
             connection = WebSocketConnection(
@@ -80,20 +131,17 @@ class RealTimeManager:
                 user_id=user_id,
                 connection_id=connection_id,
                 connected_at=datetime.utcnow(),
-                organization_id=organization_id
+                organization_id=organization_id,
+                use_msgpack=use_msgpack
             )
             
             self.connections[connection_id] = connection
             
             # Add to user connections
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = set()
             self.user_connections[user_id].add(connection_id)
             
             # Add to organization connections
             if organization_id:
-                if organization_id not in self.organization_connections:
-                    self.organization_connections[organization_id] = set()
                 self.organization_connections[organization_id].add(connection_id)
             
             logger.info(f"WebSocket connected: user_id={user_id}, connection_id={connection_id}")
@@ -102,11 +150,11 @@ class RealTimeManager:
             await self.send_to_connection(connection_id, {
                 "type": "connection_established",
                 "connection_id": connection_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": _now_ms(),
                 "message": "Real-time connection established"
             })
             
-            # Send initial statistics
+            # Send initial statistics; the new connection needs them even if the user's other tabs are current
             await self.send_dashboard_statistics(user_id)
             
             return connection_id
@@ -127,16 +175,19 @@ class RealTimeManager:
                 del self.connections[connection_id]
                 
                 # Remove from user connections
-                if user_id in self.user_connections:
-                    self.user_connections[user_id].discard(connection_id)
-                    if not self.user_connections[user_id]:
-                        del self.user_connections[user_id]
+                user_set = self.user_connections.get(user_id)
+                if user_set is not None:
+                    user_set.discard(connection_id)
+                    if not user_set:
+                        self.user_connections.pop(user_id, None)
+                        self._last_stats_hash.pop(user_id, None)
                 
                 # Remove from organization connections
-                if organization_id and organization_id in self.organization_connections:
-                    self.organization_connections[organization_id].discard(connection_id)
-                    if not self.organization_connections[organization_id]:
-                        del self.organization_connections[organization_id]
+                org_set = self.organization_connections.get(organization_id) if organization_id else None
+                if org_set is not None:
+                    org_set.discard(connection_id)
+                    if not org_set:
+                        self.organization_connections.pop(organization_id, None)
                 
                 logger.info(f"WebSocket disconnected: connection_id={connection_id}")
                 
@@ -145,10 +196,25 @@ class RealTimeManager:
     
     async def send_to_connection(self, connection_id: str, data: Dict[str, Any]) -> bool:
         """Send data to a specific connection"""
+        connection = self.connections.get(connection_id)
+        if connection is None:
+            return False
+        try:
+            payload = _encode(data, connection.use_msgpack)
+        except Exception as e:
+            logger.error(f"Error encoding message for connection {connection_id}: {e}")
+            return False
+        return await self._send_raw(connection_id, payload)
+    
+    async def _send_raw(self, connection_id: str, payload) -> bool:
+        """Send an already-encoded message (bytes for MessagePack, str for JSON) to a specific connection"""
         try:
             if connection_id in self.connections:
                 websocket = self.connections[connection_id].websocket
-                await websocket.send_text(json.dumps(data))
+                if isinstance(payload, bytes):
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_text(payload)
                 return True
             return False
         except WebSocketDisconnect:
@@ -158,34 +224,43 @@ class RealTimeManager:
             logger.error(f"Error sending to connection {connection_id}: {e}")
             return False
     
+    async def _send_to_many(self, connection_ids: List[str], data: Dict[str, Any]) -> int:
+        """Encode data once per wire format and send it to all given connections concurrently"""
+        if not connection_ids:
+            return 0
+        payloads = {}
+        sends = []
+        try:
+            for connection_id in connection_ids:
+                connection = self.connections.get(connection_id)
+                if connection is None:
+                    continue
+                if connection.use_msgpack not in payloads:
+                    payloads[connection.use_msgpack] = _encode(data, connection.use_msgpack)
+                sends.append(self._send_raw(connection_id, payloads[connection.use_msgpack]))
+        except Exception as e:
+            for send in sends:
+                send.close()
+            logger.error(f"Error encoding message for {len(connection_ids)} connections: {e}")
+            return 0
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        return sum(1 for result in results if result is True)
+    
     async def send_to_user(self, user_id: str, data: Dict[str, Any]) -> int:
         """Send data to all connections of a specific user"""
-        sent_count = 0
-        if user_id in self.user_connections:
-            connection_ids = list(self.user_connections[user_id])  # Create copy to avoid modification during iteration
-            for connection_id in connection_ids:
-                if await self.send_to_connection(connection_id, data):
-                    sent_count += 1
-        return sent_count
+        # Copy the ids so disconnects during the sends don't modify the set we iterate
+        connection_ids = list(self.user_connections.get(user_id, ()))
+        return await self._send_to_many(connection_ids, data)
     
     async def send_to_organization(self, organization_id: str, data: Dict[str, Any]) -> int:
         """Send data to all connections in an organization"""
-        sent_count = 0
-        if organization_id in self.organization_connections:
-            connection_ids = list(self.organization_connections[organization_id])
-            for connection_id in connection_ids:
-                if await self.send_to_connection(connection_id, data):
-                    sent_count += 1
-        return sent_count
+        connection_ids = list(self.organization_connections.get(organization_id, ()))
+        return await self._send_to_many(connection_ids, data)
     
     async def broadcast_to_all(self, data: Dict[str, Any]) -> int:
         """Send data to all connected users"""
-        sent_count = 0
         connection_ids = list(self.connections.keys())
-        for connection_id in connection_ids:
-            if await self.send_to_connection(connection_id, data):
-                sent_count += 1
-        return sent_count
+        return await self._send_to_many(connection_ids, data)
     
     async def notify_threat_detected(self, user_id: str, scan_result: Dict[str, Any]):
         """Send real-time threat detection notification"""
@@ -213,6 +288,7 @@ class RealTimeManager:
                     priority=priority
                 )
                 
+                # Built once here; send_to_user encodes it once for all of the user's connections
                 await self.send_to_user(user_id, {
                     "type": "notification",
                     "notification": notification.to_dict()
@@ -229,7 +305,7 @@ class RealTimeManager:
             await self.send_to_user(user_id, {
                 "type": "scan_completed",
                 "scan_result": scan_result,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_ms()
             })
             
             # Update statistics in real-time
@@ -238,36 +314,40 @@ class RealTimeManager:
         except Exception as e:
             logger.error(f"Error sending scan completion: {e}")
     
-    async def send_dashboard_statistics(self, user_id: str):
-        """Send real-time dashboard statistics"""
+    async def send_dashboard_statistics(self, user_id: str, skip_unchanged: bool = False, *,
+                                        day_start: Optional[datetime] = None,
+                                        day_end: Optional[datetime] = None):
+        """Send real-time dashboard statistics; with skip_unchanged, only if they changed since the last push"""
         try:
             db = get_database()
             
-            # Get today's scans for the user
-            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            tomorrow = today + timedelta(days=1)
+            # Get today's scans for the user; the periodic update passes the bounds in once per tick
+            if day_start is None or day_end is None:
+                day_start, day_end = _utc_day_bounds()
+            today, tomorrow = day_start, day_end
             
-            # Count today's scans
-            today_scans = await db.email_scans.count_documents({
-                "user_id": user_id,
-                "created_at": {"$gte": today, "$lt": tomorrow}
-            })
-            
-            # Count threats blocked
-            threats_blocked = await db.email_scans.count_documents({
-                "user_id": user_id,
-                "created_at": {"$gte": today, "$lt": tomorrow},
-                "scan_result": {"$in": ["potential_phishing", "phishing"]}
-            })
-            
-            # Calculate average risk score
+            # Today's scan count, threats blocked and average risk in one round trip
             pipeline = [
                 {"$match": {"user_id": user_id, "created_at": {"$gte": today, "$lt": tomorrow}}},
-                {"$group": {"_id": None, "avg_risk": {"$avg": "$risk_score"}}}
+                {"$facet": {
+                    "total": [{"$count": "n"}],
+                    "threats": [
+                        {"$match": {"scan_result": {"$in": ["potential_phishing", "phishing"]}}},
+                        {"$count": "n"}
+                    ],
+                    "risk": [{"$group": {"_id": None, "avg": {"$avg": "$risk_score"}}}]
+                }}
             ]
             
-            avg_risk_result = await db.email_scans.aggregate(pipeline).to_list(1)
-            avg_risk = avg_risk_result[0]["avg_risk"] if avg_risk_result else 0
+            facets = (await db.email_scans.aggregate(pipeline).to_list(1))[0]
+            today_scans = facets["total"][0]["n"] if facets["total"] else 0
+            threats_blocked = facets["threats"][0]["n"] if facets["threats"] else 0
+            avg_risk = (facets["risk"][0]["avg"] or 0) if facets["risk"] else 0
+            
+            # Unchanged counts and risk mean no new scans, so skip the recent-scans query and the push
+            stats_hash = hash((today, today_scans, threats_blocked, avg_risk))
+            if skip_unchanged and self._last_stats_hash.get(user_id) == stats_hash:
+                return
             
             # Get recent scans
             recent_scans = await db.email_scans.find({
@@ -294,11 +374,12 @@ class RealTimeManager:
                     "threats_blocked": threats_blocked,
                     "avg_risk_score": round(avg_risk, 1),
                     "recent_scans": formatted_scans,
-                    "last_updated": datetime.utcnow().isoformat()
+                    "last_updated": _now_ms()
                 }
             }
             
             await self.send_to_user(user_id, statistics)
+            self._last_stats_hash[user_id] = stats_hash
             
         except Exception as e:
             logger.error(f"Error sending dashboard statistics: {e}")
@@ -313,7 +394,7 @@ class RealTimeManager:
                     "severity": threat_data.get("severity"),
                     "description": threat_data.get("description"),
                     "indicators": threat_data.get("indicators", []),
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": _now_ms()
                 }
             }
             
@@ -331,7 +412,7 @@ class RealTimeManager:
                 "data": {
                     "message": alert_message,
                     "priority": priority,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": _now_ms()
                 }
             }
             
@@ -369,16 +450,37 @@ class RealTimeManager:
     
     async def _periodic_statistics_update(self):
         """Periodically update statistics for all connected users"""
+        # Ticks are scheduled against monotonic deadlines so the time spent updating doesn't stretch the cadence
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while True:
             try:
-                await asyncio.sleep(30)  # Update every 30 seconds
+                next_tick += STATS_UPDATE_INTERVAL
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # The last update overran the interval; start the next one now rather than bursting to catch up
+                    logger.warning(f"Statistics update is {-delay:.1f}s behind schedule; "
+                                   f"{len(self.user_connections)} users connected")
+                    next_tick = loop.time()
+                else:
+                    await asyncio.sleep(delay)
+                
+                day_start, day_end = _utc_day_bounds()
+                semaphore = asyncio.Semaphore(STATS_UPDATE_CONCURRENCY)
+                
+                async def update_user(user_id: str):
+                    async with semaphore:
+                        # Explicit requests always get a reply; only the periodic push skips unchanged stats
+                        await self.send_dashboard_statistics(user_id, skip_unchanged=True,
+                                                             day_start=day_start, day_end=day_end)
                 
-                for user_id in list(self.user_connections.keys()):
-                    await self.send_dashboard_statistics(user_id)
+                # Overlap the per-user Mongo round trips instead of awaiting them one by one
+                await asyncio.gather(*(update_user(user_id) for user_id in list(self.user_connections.keys())))
                 
             except Exception as e:
                 logger.error(f"Error in periodic statistics update: {e}")
                 await asyncio.sleep(60)  # Wait longer on error
+                next_tick = loop.time()
     
     async def _connection_cleanup(self):
         """Clean up stale connections"""